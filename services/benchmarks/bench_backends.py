@@ -0,0 +1,74 @@
+"""Fit/predict/size/accuracy comparison of the stock model backends.
+
+For each symbol the first 80% of the feature history is used to fit, and the
+rest is held out. It reports fit time, single-row predict latency, pickled
+artifact size, one-step-ahead RMSE on the hold-out, and the MAE of a 15-day
+recursive forecast from the split. Run from ``services/``:
+
+    python -m benchmarks.bench_backends [--symbols AAPL MSFT] [--backends rf hgb ridge]
+"""
+import argparse
+import io
+import time
+import joblib
+import numpy as np
+from stock.backends import BACKENDS
+from stock.forecast_engine import forecast_recursive
+from stock.training import SYMBOLS, load_features, fit_model
+
+HORIZON = 15
+
+
+def evaluate(df, backend, split=0.8, repeat=50):
+    cut = int(len(df) * split)
+    train, test = df.iloc[:cut], df.iloc[cut:]
+
+    start = time.perf_counter()
+    model, scaler = fit_model(train, backend)
+    fit_seconds = time.perf_counter() - start
+
+    buf = io.BytesIO()
+    joblib.dump((model, scaler), buf)
+
+    scaled = scaler.transform(test[['Close', 'SMA_50', 'EMA_20']].to_numpy())
+    row = scaled[:1, 1:3]
+    start = time.perf_counter()
+    for _ in range(repeat):
+        model.predict(row)
+    predict_seconds = (time.perf_counter() - start) / repeat
+
+    pred = model.predict(scaled[:, 1:3])
+    pred_close = (pred - scaler.min_[0]) / scaler.scale_[0]
+    rmse = float(np.sqrt(np.mean((pred_close - test['Close'].to_numpy()) ** 2)))
+
+    last = train.iloc[-1]
+    path = forecast_recursive([model], [scaler], [last['SMA_50']], [last['EMA_20']], HORIZON)[0]
+    actual = test['Close'].to_numpy()[:HORIZON]
+    mae = float(np.mean(np.abs(path[:len(actual)] - actual)))
+
+    return {"fit_s": fit_seconds, "predict_ms": predict_seconds * 1e3,
+            "size_kb": buf.getbuffer().nbytes / 1024, "rmse_1step": rmse, f"mae_{HORIZON}d": mae}
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument("--symbols", nargs="*", default=SYMBOLS[:3])
+    parser.add_argument("--backends", nargs="*", default=list(BACKENDS), choices=list(BACKENDS))
+    args = parser.parse_args(argv)
+
+    results = {b: [] for b in args.backends}
+    for sym in args.symbols:
+        df = load_features(sym)
+        for backend in args.backends:
+            results[backend].append(evaluate(df, backend))
+
+    keys = list(next(iter(results.values()))[0])
+    print(f"symbols={len(args.symbols)} (mean over symbols)")
+    print(f"{'backend':<8}" + "".join(f"{k:>14}" for k in keys))
+    for backend, rows in results.items():
+        print(f"{backend:<8}" + "".join(f"{np.mean([r[k] for r in rows]):>14.4f}" for k in keys))
+    return 0
+
+
+if __name__ == "__main__":
+    raise SystemExit(main())
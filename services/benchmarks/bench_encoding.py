@@ -0,0 +1,53 @@
+"""Compare record-style JSON against the columnar encodings for a time series.
+
+Run from ``services/``:
+
+    python -m benchmarks.bench_encoding [--rows 1260]
+"""
+import argparse
+import json
+import time
+import numpy as np
+import pandas as pd
+from common.encoding import COLUMNAR_JSON, COLUMNAR_F32, columnar_response, decode_f32
+
+
+def timed(fn, repeat):
+    start = time.perf_counter()
+    for _ in range(repeat):
+        result = fn()
+    return result, (time.perf_counter() - start) / repeat
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument("--rows", type=int, default=1260, help="Points in the series (1260 ~ 5y of trading days).")
+    parser.add_argument("--repeat", type=int, default=50)
+    args = parser.parse_args(argv)
+
+    dates = np.arange(np.datetime64("2020-01-01"), np.datetime64("2020-01-01") + args.rows).astype("datetime64[D]")
+    closes = 100 + np.cumsum(np.random.default_rng(0).normal(0, 1, args.rows))
+
+    def records():
+        df = pd.DataFrame({"Date": pd.to_datetime(dates).strftime("%Y-%m-%d"), "Close": closes})
+        return json.dumps({"symbol": "AAPL", "data": df.to_dict(orient="records")}).encode()
+
+    baseline, base_seconds = timed(records, args.repeat)
+    print(f"rows={args.rows}")
+    print(f"{'encoding':<32}{'ms':>10}{'bytes':>12}{'speedup':>10}{'size':>8}")
+    print(f"{'records (json)':<32}{base_seconds * 1e3:>10.3f}{len(baseline):>12}{1:>10.1f}{1:>8.1f}")
+    for media_type in (COLUMNAR_JSON, COLUMNAR_F32):
+        body, seconds = timed(
+            lambda: columnar_response(media_type, {"symbol": "AAPL"}, {"dates": dates, "values": closes}).body,
+            args.repeat)
+        print(f"{media_type:<32}{seconds * 1e3:>10.3f}{len(body):>12}"
+              f"{base_seconds / seconds:>10.1f}{len(baseline) / len(body):>8.1f}")
+
+    _, columns = decode_f32(columnar_response(COLUMNAR_F32, {}, {"dates": dates, "values": closes}).body)
+    assert np.array_equal(columns["dates"], dates)
+    assert np.allclose(columns["values"], closes.astype(np.float32))
+    return 0
+
+
+if __name__ == "__main__":
+    raise SystemExit(main())
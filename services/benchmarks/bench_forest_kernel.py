@@ -0,0 +1,71 @@
+"""Compare the flattened forest kernel against sklearn's RandomForestRegressor.predict.
+
+Uses trained random-forest checkpoints from the artifact store when present, otherwise fits
+synthetic forests of the same shape. Run from ``services/``:
+
+    python -m benchmarks.bench_forest_kernel [--symbols AAPL MSFT] [--rows 60]
+"""
+import argparse
+import time
+import numpy as np
+from sklearn.ensemble import RandomForestRegressor
+from stock.forest_kernel import compile_forest, ForestSet
+from stock.training import SYMBOLS
+from stock.artifact_store import get_artifact_store
+
+
+def load_or_fit(symbols, store):
+    models = []
+    rng = np.random.default_rng(42)
+    for sym in symbols:
+        if store.info(sym) is not None:
+            model, _ = store.load(sym)
+            if isinstance(model, RandomForestRegressor):
+                models.append(model)
+                continue
+        X = rng.random((2700, 2))
+        y = 0.6 * X[:, 0] + 0.4 * X[:, 1] + rng.normal(0, 0.02, len(X))
+        models.append(RandomForestRegressor(n_estimators=100, random_state=42).fit(X, y))
+    return models
+
+
+def timed(fn, repeat):
+    start = time.perf_counter()
+    for _ in range(repeat):
+        result = fn()
+    return result, (time.perf_counter() - start) / repeat
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument("--symbols", nargs="*", default=SYMBOLS)
+    parser.add_argument("--rows", type=int, default=60, help="Rows per symbol.")
+    parser.add_argument("--repeat", type=int, default=5)
+    args = parser.parse_args(argv)
+
+    models = load_or_fit(args.symbols, get_artifact_store())
+    start = time.perf_counter()
+    forest_set = ForestSet([compile_forest(m) for m in models])
+    compile_seconds = time.perf_counter() - start
+
+    rng = np.random.default_rng(0)
+    X = rng.random((len(models) * args.rows, 2))
+    ids = np.repeat(np.arange(len(models)), args.rows)
+
+    expected, sk_seconds = timed(
+        lambda: np.concatenate([m.predict(X[ids == i]) for i, m in enumerate(models)]), args.repeat)
+    _, sk_row_seconds = timed(
+        lambda: [models[i].predict(X[j:j + 1]) for j, i in enumerate(ids)], 1)
+    actual, kernel_seconds = timed(lambda: forest_set.predict(ids, X), args.repeat)
+
+    exact = np.array_equal(actual, expected)
+    print(f"symbols={len(models)} rows={len(X)} compile={compile_seconds * 1e3:.1f}ms")
+    print(f"sklearn batched per symbol: {sk_seconds * 1e3:9.2f} ms")
+    print(f"sklearn one row per call:   {sk_row_seconds * 1e3:9.2f} ms")
+    print(f"flattened kernel:           {kernel_seconds * 1e3:9.2f} ms")
+    print(f"outputs identical: {exact} (max abs diff {np.abs(actual - expected).max():.3g})")
+    return 0 if exact else 1
+
+
+if __name__ == "__main__":
+    raise SystemExit(main())
@@ -0,0 +1,55 @@
+"""Per-horizon latency of the gold LSTM rollout versus the original predict loop.
+
+The baseline calls ``model.predict`` once per day and regrows the window with
+``np.append``, as ``/gold/predict`` used to. The rollout uses the compiled step
+and ring buffer from ``gold.lstm_runtime``. Run from ``services/gold/`` so the
+model and data files resolve:
+
+    PYTHONPATH=.. python -m benchmarks.bench_gold_rollout [--horizons 1 15 60]
+"""
+import argparse
+import time
+import numpy as np
+from gold.lstm_runtime import LSTMForecaster, rollout
+from tensorflow.keras.models import load_model
+
+
+def predict_loop(model, window, days):
+    pred_scaled = []
+    for _ in range(days):
+        pred = model.predict(window, verbose=0)[0][0]
+        pred_scaled.append(pred)
+        window = np.append(window[:, 1:, :], [[[pred]]], axis=1)
+    return np.array(pred_scaled, dtype=np.float32)
+
+
+def timed(fn, repeat):
+    start = time.perf_counter()
+    for _ in range(repeat):
+        result = fn()
+    return result, (time.perf_counter() - start) / repeat
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument("--horizons", nargs="*", type=int, default=[1, 5, 15, 30, 60])
+    parser.add_argument("--repeat", type=int, default=3)
+    args = parser.parse_args(argv)
+
+    forecaster = LSTMForecaster()
+    step, _, seed = forecaster.state()
+    model = load_model(forecaster.model_path)
+    rollout(step, seed, 1)  # trace once outside the timings
+
+    print(f"{'days':>6}{'predict loop ms':>18}{'rollout ms':>14}{'speedup':>10}{'max abs diff':>15}")
+    for days in args.horizons:
+        expected, base_seconds = timed(lambda: predict_loop(model, seed, days), args.repeat)
+        got, seconds = timed(lambda: rollout(step, seed, days), args.repeat)
+        diff = float(np.max(np.abs(got - expected)))
+        print(f"{days:>6}{base_seconds * 1e3:>18.2f}{seconds * 1e3:>14.2f}"
+              f"{base_seconds / seconds:>10.1f}{diff:>15.2e}")
+    return 0
+
+
+if __name__ == "__main__":
+    raise SystemExit(main())
@@ -0,0 +1,69 @@
+"""Check that repeated default-universe batch calls are served from the model registry.
+
+Looks up every symbol in order, as ``/stock/predict/batch`` does, ``--calls`` times
+against a registry with the default budget. Only the first call may miss. Uses
+trained checkpoints from the artifact store when present, otherwise synthetic
+random forests of the same shape. Run from ``services/``:
+
+    python -m benchmarks.bench_registry [--symbols AAPL MSFT] [--calls 3]
+"""
+import argparse
+import time
+import numpy as np
+from sklearn.ensemble import RandomForestRegressor
+from sklearn.preprocessing import MinMaxScaler
+from stock.artifact_store import get_artifact_store, _dumps
+from stock.model_registry import ModelRegistry
+from stock.training import SYMBOLS
+
+
+class SyntheticStore:
+    """Artifact-store stand-in with one synthetic forest per symbol not trained locally."""
+
+    def __init__(self, symbols, rows):
+        self.checkpoints = {}
+        rng = np.random.default_rng(42)
+        for sym in symbols:
+            X = rng.random((rows, 2))
+            y = 0.6 * X[:, 0] + 0.4 * X[:, 1] + rng.normal(0, 0.02, len(X))
+            model = RandomForestRegressor(n_estimators=100, random_state=42).fit(X, y)
+            scaler = MinMaxScaler().fit(np.column_stack([y, X]))
+            self.checkpoints[sym] = (model, scaler, len(_dumps(model)) + len(_dumps(scaler)))
+
+    def info(self, symbol):
+        return {"version": 0, "trained_at": 0.0, "bytes": self.checkpoints[symbol][2]}
+
+    def load(self, symbol):
+        return self.checkpoints[symbol][:2]
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument("--symbols", nargs="*", default=SYMBOLS)
+    parser.add_argument("--calls", type=int, default=3)
+    parser.add_argument("--rows", type=int, default=2700, help="Training rows per synthetic forest.")
+    args = parser.parse_args(argv)
+
+    store = get_artifact_store()
+    if any(store.info(sym) is None for sym in args.symbols):
+        print("Some symbols are untrained; using synthetic forests for all of them.")
+        store = SyntheticStore(args.symbols, args.rows)
+
+    registry = ModelRegistry(store)
+    for call in range(args.calls):
+        start = time.perf_counter()
+        for sym in args.symbols:
+            registry.get(sym)
+        print(f"call {call + 1}: {(time.perf_counter() - start) * 1e3:9.2f} ms")
+
+    stats = registry.stats()
+    print(f"entries={stats['entries']} bytes={stats['bytes'] / 2 ** 20:.1f}MB "
+          f"budget={stats['max_bytes'] / 2 ** 20:.0f}MB")
+    print(f"hits={stats['hits']} misses={stats['misses']} evictions={stats['evictions']}")
+    all_hits = stats["misses"] == len(args.symbols) and stats["evictions"] == 0
+    print(f"repeated calls all hits: {all_hits}")
+    return 0 if all_hits else 1
+
+
+if __name__ == "__main__":
+    raise SystemExit(main())
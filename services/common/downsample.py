@@ -0,0 +1,46 @@
+"""Largest-Triangle-Three-Buckets downsampling for chart series."""
+import numpy as np
+
+
+def lttb_indices(x, y, n_out: int) -> np.ndarray:
+    """Indices of the ``n_out`` points LTTB keeps from the series ``(x, y)``.
+
+    The first and last points are always kept. Bucket boundaries and the
+    next-bucket averages are computed up front with array operations. Each
+    bucket's best point is then picked with one vectorized area computation.
+    """
+    x = np.asarray(x, dtype=np.float64)
+    y = np.asarray(y, dtype=np.float64)
+    n = len(x)
+    if n_out >= n or n_out < 3:
+        return np.arange(n)
+
+    # Buckets for the n_out - 2 interior points, as [edges[i], edges[i + 1]).
+    edges = np.floor(np.linspace(1, n - 1, n_out - 1)).astype(np.intp)
+    counts = np.diff(edges)
+    avg_x = np.add.reduceat(x[1:n - 1], edges[:-1] - 1) / counts
+    avg_y = np.add.reduceat(y[1:n - 1], edges[:-1] - 1) / counts
+    # The bucket after the last interior one is the final point itself.
+    next_x = np.append(avg_x[1:], x[-1])
+    next_y = np.append(avg_y[1:], y[-1])
+
+    out = np.empty(n_out, dtype=np.intp)
+    out[0], out[-1] = 0, n - 1
+    a = 0
+    for i in range(n_out - 2):
+        lo, hi = edges[i], edges[i + 1]
+        ax, ay = x[a], y[a]
+        area = np.abs((ax - next_x[i]) * (y[lo:hi] - ay) - (ax - x[lo:hi]) * (next_y[i] - ay))
+        a = lo + int(np.argmax(area))
+        out[i + 1] = a
+    return out
+
+
+def lttb(x, y, n_out: int):
+    """Downsampled ``(x, y)`` views of the series (see ``lttb_indices``)."""
+    idx = lttb_indices(x if not _is_datetime(x) else np.asarray(x).astype("datetime64[D]").astype(np.int64), y, n_out)
+    return np.asarray(x)[idx], np.asarray(y)[idx]
+
+
+def _is_datetime(x) -> bool:
+    return np.issubdtype(np.asarray(x).dtype, np.datetime64)
@@ -0,0 +1,88 @@
+"""Opt-in columnar encodings for time-series responses.
+
+Endpoints keep their record-style JSON by default. Clients can ask for:
+
+* ``application/vnd.columnar+json`` (or ``?format=columnar``): parallel arrays,
+  e.g. ``{"symbol": ..., "dates": [...], "values": [...]}``, serialized with
+  orjson when it is installed.
+* ``application/x-columnar-f32``: a binary frame. It is a little-endian uint32
+  header length, then a UTF-8 JSON header, then the raw column buffers in
+  header order. Floats are ``<f4``. Dates are ``<i4`` days since 1970-01-01.
+"""
+import json
+import struct
+import numpy as np
+from fastapi.responses import Response
+
+try:
+    import orjson
+except ImportError:  # optional speed-up
+    orjson = None
+
+COLUMNAR_JSON = "application/vnd.columnar+json"
+COLUMNAR_F32 = "application/x-columnar-f32"
+
+
+def negotiate(accept: str = None, fmt: str = None):
+    """Pick ``COLUMNAR_F32``, ``COLUMNAR_JSON`` or None (legacy records) for a request."""
+    accept = accept or ""
+    if fmt == "f32" or COLUMNAR_F32 in accept:
+        return COLUMNAR_F32
+    if fmt == "columnar" or COLUMNAR_JSON in accept:
+        return COLUMNAR_JSON
+    return None
+
+
+def dumps(payload) -> bytes:
+    if orjson is not None:
+        return orjson.dumps(payload, option=orjson.OPT_SERIALIZE_NUMPY)
+    return json.dumps(payload, default=_to_builtin).encode()
+
+
+def columnar_response(media_type: str, meta: dict, columns: dict) -> Response:
+    """Encode ``columns`` (name -> date or float array) plus ``meta`` as ``media_type``."""
+    if media_type == COLUMNAR_F32:
+        return Response(content=encode_f32(meta, columns), media_type=COLUMNAR_F32)
+    payload = dict(meta)
+    for name, values in columns.items():
+        values = np.asarray(values)
+        if np.issubdtype(values.dtype, np.datetime64):
+            values = np.datetime_as_string(values, unit="D").tolist()
+        payload[name] = values
+    return Response(content=dumps(payload), media_type=COLUMNAR_JSON)
+
+
+def encode_f32(meta: dict, columns: dict) -> bytes:
+    specs, buffers = [], []
+    for name, values in columns.items():
+        values = np.asarray(values)
+        if np.issubdtype(values.dtype, np.datetime64):
+            buf = values.astype("datetime64[D]").astype("<i4")
+        else:
+            buf = values.astype("<f4")
+        specs.append({"name": name, "dtype": buf.dtype.str, "length": len(buf)})
+        buffers.append(buf.tobytes())
+    header = dumps({**meta, "columns": specs})
+    return struct.pack("<I", len(header)) + header + b"".join(buffers)
+
+
+def decode_f32(data: bytes):
+    """Inverse of ``encode_f32``: returns ``(meta, columns)``."""
+    (size,) = struct.unpack_from("<I", data)
+    meta = json.loads(data[4:4 + size])
+    offset = 4 + size
+    columns = {}
+    for spec in meta.pop("columns"):
+        dtype = np.dtype(spec["dtype"])
+        col = np.frombuffer(data, dtype=dtype, count=spec["length"], offset=offset)
+        offset += col.nbytes
+        columns[spec["name"]] = col.astype("datetime64[D]") if dtype.kind == "i" else col
+    return meta, columns
+
+
+def _to_builtin(value):
+    if isinstance(value, np.ndarray):
+        return value.tolist()
+    if isinstance(value, np.generic):
+        return value.item()
+    raise TypeError(f"Object of type {type(value).__name__} is not JSON serializable")
@@ -0,0 +1,46 @@
+"""Fixed-length training windows over a series for the sequence models."""
+import numpy as np
+from numpy.lib.stride_tricks import sliding_window_view
+
+
+def sliding_windows(data, seq_len: int = 60):
+    """``(X, y)`` where ``X[i] = data[i:i + seq_len]`` and ``y[i] = data[i + seq_len]``.
+
+    ``data`` is ``(n,)`` or ``(n, features)``. ``X`` has shape
+    ``(n - seq_len, seq_len, features)`` and ``y`` has shape ``(n - seq_len, features)``.
+    Both are views into ``data`` (``X`` a read-only strided one), so nothing is copied.
+    """
+    data = np.asarray(data)
+    if data.ndim == 1:
+        data = data[:, None]
+    n = len(data) - seq_len
+    if n <= 0:
+        return np.empty((0, seq_len, data.shape[1]), dtype=data.dtype), data[:0]
+    # sliding_window_view puts the window axis last: (n + 1, features, seq_len).
+    X = sliding_window_view(data, seq_len, axis=0)[:n].transpose(0, 2, 1)
+    return X, data[seq_len:]
+
+
+def window_batches(data, seq_len: int = 60, batch_size: int = 32, start: int = 0, stop: int = None,
+                   shuffle: bool = False, repeat: bool = False, seed: int = None):
+    """Yield ``(X, y)`` batches of the windows in ``[start, stop)``.
+
+    Each batch is copied out of the strided view on demand, so only one batch
+    is materialized at a time. ``data`` can be a ``np.memmap`` larger than
+    memory. With ``repeat=True`` the generator loops forever. Pass it to
+    ``model.fit`` together with ``steps_per_epoch``.
+    """
+    X, y = sliding_windows(data, seq_len)
+    stop = len(X) if stop is None else min(stop, len(X))
+    rng = np.random.default_rng(seed)
+    while True:
+        order = np.arange(start, stop)
+        if shuffle:
+            rng.shuffle(order)
+        for i in range(0, len(order), batch_size):
+            idx = order[i:i + batch_size]
+            if not shuffle:
+                idx = slice(idx[0], idx[-1] + 1)
+            yield np.ascontiguousarray(X[idx]), np.ascontiguousarray(y[idx])
+        if not repeat:
+            return
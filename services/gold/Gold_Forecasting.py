@@ -1,14 +1,26 @@
+import os
+import sys
+
+sys.path.append(os.path.dirname(os.path.dirname(os.path.abspath(__file__))))  # services/, for common.*
+import argparse
 import json
+import joblib
+import math
+import multiprocessing
 import pandas as pd
 import numpy as np
 import datetime
+import time
 import warnings
+from concurrent.futures import ProcessPoolExecutor, ThreadPoolExecutor, as_completed
 
-from statsmodels.tsa.arima.model import ARIMA
 from prophet import Prophet
 from sklearn.metrics import mean_squared_error
 from sklearn.preprocessing import MinMaxScaler
 from tensorflow import keras
+from common.windowing import sliding_windows, window_batches
+from gold.dataset import load_gold_series
+from gold.arima_state import fit_arima, full_refit, refresh_arima, save_forecast
 
 Sequential = keras.models.Sequential
 Dense = keras.layers.Dense
@@ -16,133 +28,218 @@ LSTM = keras.layers.LSTM
 
 warnings.filterwarnings('ignore')
 
+# === Config ===
+file_path = './data.csv'
+SEQUENCE_LENGTH = 60
+BATCH_SIZE = 32
+RESULT_FILES = {"ARIMA": "GOLD_arima_results.json", "Prophet": "GOLD_prophet_results.json", "LSTM": "GOLD_lstm_results.json"}
+
 # === Logging function ===
 def log(message):
     timestamp = datetime.datetime.now().strftime("%Y-%m-%d %H:%M:%S")
     print(f"[{timestamp}] DEBUG: {message}")
 
 # === Load Dataset ===
-file_path = './data.csv'
-log("Loading gold price dataset...")
-
-try:
-    df = pd.read_csv(file_path)
-    log("CSV data loaded successfully.")
-except Exception as e:
-    log(f"Error reading CSV file: {e}")
-    exit()
-
-# === Preprocess ===
-TARGET_COLUMN = '24K - Global Price'
-df = df.dropna(subset=[TARGET_COLUMN])
-df.columns = df.columns.str.strip()
-df['Date'] = pd.to_datetime(df['Date'], errors='coerce')
-df.dropna(subset=['Date'], inplace=True)
-df.set_index('Date', inplace=True)
-df[TARGET_COLUMN] = df[TARGET_COLUMN].interpolate(method='linear').ffill().bfill()
+def load_series(path=file_path) -> pd.Series:
+    """Date-indexed, gap-filled gold price series, from the parsed-once dataset cache."""
+    return load_gold_series(path)
 
 # === Splits ===
-train_size = int(len(df) * 0.7)
-val_size = int(len(df) * 0.15)
-train = df[TARGET_COLUMN][:train_size]
-val = df[TARGET_COLUMN][train_size:train_size + val_size]
-test = df[TARGET_COLUMN][train_size + val_size:]
+def split_sizes(series):
+    return int(len(series) * 0.7), int(len(series) * 0.15)
+
+def split_series(series):
+    train_size, val_size = split_sizes(series)
+    return series[:train_size], series[train_size:train_size + val_size], series[train_size + val_size:]
 
-train.to_json("GOLD_train_data.json", orient='split', date_format='iso')
-val.to_json("GOLD_validation_data.json", orient='split', date_format='iso')
-test.to_json("GOLD_test_data.json", orient='split', date_format='iso')
+def save_result(filename, result):
+    with open(filename, 'w') as f:
+        json.dump(result, f)
 
 # === ARIMA ===
-log("Running ARIMA...")
-arima_model = ARIMA(train, order=(1, 1, 1)).fit()
-arima_forecast = arima_model.forecast(steps=len(test))
-arima_rmse = np.sqrt(mean_squared_error(test, arima_forecast))
-arima_result = {
-    "model": "ARIMA",
-    "rmse": arima_rmse,
-    "predictions": arima_forecast.tolist(),
-    "actual": test.tolist()
-}
-with open('GOLD_arima_results.json', 'w') as f:
-    json.dump(arima_result, f)
+def run_arima(series):
+    train, _, test = split_series(series)
+    arima_model = fit_arima(train)
+    arima_forecast = arima_model.forecast(steps=len(test))
+    arima_rmse = float(np.sqrt(mean_squared_error(test, arima_forecast)))
+    save_result(RESULT_FILES["ARIMA"], {
+        "model": "ARIMA",
+        "rmse": arima_rmse,
+        "predictions": arima_forecast.tolist(),
+        "actual": test.tolist()
+    })
+    # Live state over the full history; `--update-arima` extends it as new prices arrive.
+    results, state = full_refit(series, start_params=arima_model.params)
+    save_forecast(results, state["last_date"])
+    return arima_rmse
 
 # === Prophet ===
-log("Running Prophet...")
-prophet_data = df.reset_index()[['Date', TARGET_COLUMN]].rename(columns={'Date': 'ds', TARGET_COLUMN: 'y'})
-prophet_model = Prophet(yearly_seasonality=True)
-prophet_model.fit(prophet_data)
-future = prophet_model.make_future_dataframe(periods=len(test))
-forecast = prophet_model.predict(future)
-prophet_preds = forecast['yhat'][-len(test):].values
-prophet_rmse = np.sqrt(mean_squared_error(test, prophet_preds))
-prophet_result = {
-    "model": "Prophet",
-    "rmse": prophet_rmse,
-    "predictions": prophet_preds.tolist(),
-    "actual": test.tolist()
-}
-with open('GOLD_prophet_results.json', 'w') as f:
-    json.dump(prophet_result, f)
+def run_prophet(series):
+    _, _, test = split_series(series)
+    prophet_data = series.rename_axis('ds').reset_index(name='y')
+    prophet_model = Prophet(yearly_seasonality=True)
+    prophet_model.fit(prophet_data)
+    future = prophet_model.make_future_dataframe(periods=len(test))
+    forecast = prophet_model.predict(future)
+    prophet_preds = forecast['yhat'][-len(test):].values
+    prophet_rmse = float(np.sqrt(mean_squared_error(test, prophet_preds)))
+    save_result(RESULT_FILES["Prophet"], {
+        "model": "Prophet",
+        "rmse": prophet_rmse,
+        "predictions": prophet_preds.tolist(),
+        "actual": test.tolist()
+    })
+    return prophet_rmse
 
 # === LSTM ===
-log("Running LSTM...")
-scaler = MinMaxScaler()
-scaled_data = scaler.fit_transform(df[TARGET_COLUMN].values.reshape(-1, 1))
-sequence_length = 60
-
-def create_sequences(data, seq_length):
-    X, y = [], []
-    for i in range(len(data) - seq_length):
-        X.append(data[i:i + seq_length])
-        y.append(data[i + seq_length])
-    return np.array(X), np.array(y)
-
-X_all, y_all = create_sequences(scaled_data, sequence_length)
-split_1 = train_size - sequence_length
-split_2 = train_size + val_size - sequence_length
-
-X_train, y_train = X_all[:split_1], y_all[:split_1]
-X_val, y_val = X_all[split_1:split_2], y_all[split_1:split_2]
-X_test, y_test = X_all[split_2:], y_all[split_2:]
-
-lstm_model = Sequential([
-    LSTM(50, return_sequences=True, input_shape=(sequence_length, 1)),
-    LSTM(50),
-    Dense(25),
-    Dense(1)
-])
-lstm_model.compile(optimizer='adam', loss='mean_squared_error')
-lstm_model.fit(X_train, y_train, validation_data=(X_val, y_val), epochs=10, batch_size=32)
-
-lstm_preds_scaled = lstm_model.predict(X_test)
-lstm_preds = scaler.inverse_transform(lstm_preds_scaled)
-actual_lstm = scaler.inverse_transform(y_test.reshape(-1, 1))
-lstm_rmse = np.sqrt(mean_squared_error(actual_lstm, lstm_preds))
-
-lstm_result = {
-    "model": "LSTM",
-    "rmse": float(lstm_rmse),
-    "predictions": lstm_preds.flatten().tolist(),
-    "actual": actual_lstm.flatten().tolist()
-}
-with open('GOLD_lstm_results.json', 'w') as f:
-    json.dump(lstm_result, f)
-
-lstm_model.save("GOLD_lstm_model.keras")
-log("LSTM model saved successfully.")
+def run_lstm(series):
+    train_size, val_size = split_sizes(series)
+    scaler = MinMaxScaler()
+    scaled_data = scaler.fit_transform(series.values.reshape(-1, 1))
+    joblib.dump(scaler, "GOLD_scaler.pkl")  # /gold/predict scales its seed window with this
+
+    X_all, y_all = sliding_windows(scaled_data, SEQUENCE_LENGTH)
+    split_1 = train_size - SEQUENCE_LENGTH
+    split_2 = train_size + val_size - SEQUENCE_LENGTH
+    X_test, y_test = X_all[split_2:], y_all[split_2:]
+
+    lstm_model = Sequential([
+        LSTM(50, return_sequences=True, input_shape=(SEQUENCE_LENGTH, 1)),
+        LSTM(50),
+        Dense(25),
+        Dense(1)
+    ])
+    lstm_model.compile(optimizer='adam', loss='mean_squared_error')
+    # Training and validation windows are copied out one batch at a time, never all at once.
+    lstm_model.fit(
+        window_batches(scaled_data, SEQUENCE_LENGTH, BATCH_SIZE, stop=split_1, shuffle=True, repeat=True, seed=42),
+        steps_per_epoch=math.ceil(split_1 / BATCH_SIZE),
+        validation_data=window_batches(scaled_data, SEQUENCE_LENGTH, BATCH_SIZE, split_1, split_2, repeat=True),
+        validation_steps=math.ceil((split_2 - split_1) / BATCH_SIZE),
+        epochs=10)
+
+    lstm_preds_scaled = lstm_model.predict(X_test)
+    lstm_preds = scaler.inverse_transform(lstm_preds_scaled)
+    actual_lstm = scaler.inverse_transform(y_test.reshape(-1, 1))
+    lstm_rmse = float(np.sqrt(mean_squared_error(actual_lstm, lstm_preds)))
+
+    save_result(RESULT_FILES["LSTM"], {
+        "model": "LSTM",
+        "rmse": lstm_rmse,
+        "predictions": lstm_preds.flatten().tolist(),
+        "actual": actual_lstm.flatten().tolist()
+    })
+    lstm_model.save("GOLD_lstm_model.keras")
+    log("LSTM model saved successfully.")
+    return lstm_rmse
+
+MODEL_TASKS = {"ARIMA": run_arima, "Prophet": run_prophet, "LSTM": run_lstm}
+
+# === Parallel Training ===
+def _timed_task(name, series):
+    start = time.perf_counter()
+    try:
+        rmse = MODEL_TASKS[name](series)
+        return {"model": name, "status": "ok", "rmse": rmse, "seconds": time.perf_counter() - start}
+    except Exception as e:
+        return {"model": name, "status": "error", "error": str(e), "seconds": time.perf_counter() - start}
+
+def _isolated_task(name, series):
+    """Run one model in a process of its own, so a crash there cannot take down the others."""
+    start = time.perf_counter()
+    try:
+        with ProcessPoolExecutor(max_workers=1, mp_context=multiprocessing.get_context("spawn")) as pool:
+            return pool.submit(_timed_task, name, series).result()
+    except Exception as e:
+        # BrokenProcessPool when the worker died outright (native TensorFlow crash, OOM kill).
+        return {"model": name, "status": "error", "error": f"worker process failed: {e!r}",
+                "seconds": time.perf_counter() - start}
+
+def train_models(series, models=None, workers=None):
+    """Fit ``models`` (default: all), each in its own process. Returns one report per model.
+
+    Each model writes its own results file and runs in a separate single-worker
+    pool, so one failing or crashing fit leaves the others' runs and artifacts
+    intact. At most ``workers`` run at once. Processes are spawned rather than
+    forked because TensorFlow is not fork-safe once imported.
+    """
+    models = list(models or MODEL_TASKS)
+    workers = min(workers or len(models), len(models))
+    reports = []
+    log(f"Running {', '.join(models)} with {workers} worker(s)...")
+    with ThreadPoolExecutor(max_workers=workers) as pool:
+        futures = [pool.submit(_isolated_task, name, series) for name in models]
+        for future in as_completed(futures):
+            report = future.result()
+            reports.append(report)
+            if report["status"] == "ok":
+                log(f"✅ {report['model']} done in {report['seconds']:.2f}s (RMSE {report['rmse']:.4f})")
+            else:
+                log(f"❌ {report['model']} failed after {report['seconds']:.2f}s: {report['error']}")
+    return reports
 
 # === Determine Best Model ===
-model_rmses = {
-    "ARIMA": arima_rmse,
-    "Prophet": prophet_rmse,
-    "LSTM": lstm_rmse
-}
-best_model = min(model_rmses, key=model_rmses.get)
-with open("GOLD_best_model.json", "w") as f:
-    json.dump({
-        "best_model": best_model,
-        "rmses": model_rmses
-    }, f)
-
-log(f"✅ Best model: {best_model} with RMSE {model_rmses[best_model]:.4f}")
-log("All model results saved.")
+def save_best_model(reports):
+    """Pick the lowest-RMSE model once every task has finished.
+
+    Models not run this time keep competing with the RMSE in their existing
+    results file; models that failed are left out.
+    """
+    model_rmses = {}
+    ran = {r["model"] for r in reports}
+    for name, filename in RESULT_FILES.items():
+        if name not in ran and os.path.exists(filename):
+            with open(filename) as f:
+                model_rmses[name] = json.load(f)["rmse"]
+    model_rmses.update({r["model"]: r["rmse"] for r in reports if r["status"] == "ok"})
+    model_rmses = {name: model_rmses[name] for name in RESULT_FILES if name in model_rmses}
+    if not model_rmses:
+        return None
+    best_model = min(model_rmses, key=model_rmses.get)
+    with open("GOLD_best_model.json", "w") as f:
+        json.dump({
+            "best_model": best_model,
+            "rmses": model_rmses
+        }, f)
+    log(f"✅ Best model: {best_model} with RMSE {model_rmses[best_model]:.4f}")
+    return best_model
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description="Train the gold price forecasting models.")
+    parser.add_argument("--models", nargs="*", choices=list(MODEL_TASKS), default=list(MODEL_TASKS))
+    parser.add_argument("--workers", type=int, default=None, help="Worker processes (default: one per model).")
+    parser.add_argument("--update-arima", action="store_true",
+                        help="Only fold new prices into the persisted ARIMA state (full refit when due).")
+    parser.add_argument("--full", action="store_true", help="With --update-arima, force a full refit.")
+    args = parser.parse_args(argv)
+
+    log("Loading gold price dataset...")
+    try:
+        series = load_series()
+        log("CSV data loaded successfully.")
+    except Exception as e:
+        log(f"Error reading CSV file: {e}")
+        return 1
+
+    if args.update_arima:
+        report = refresh_arima(series, force=args.full)
+        log(f"ARIMA {report['mode']}: {report['points']} point(s), {report['nobs']} total, {report['seconds']:.3f}s")
+        return 0
+
+    train, val, test = split_series(series)
+    train.to_json("GOLD_train_data.json", orient='split', date_format='iso')
+    val.to_json("GOLD_validation_data.json", orient='split', date_format='iso')
+    test.to_json("GOLD_test_data.json", orient='split', date_format='iso')
+
+    start = time.perf_counter()
+    reports = train_models(series, args.models, args.workers)
+    log(f"Training finished in {time.perf_counter() - start:.2f}s "
+        f"(sum of model times {sum(r['seconds'] for r in reports):.2f}s).")
+    if save_best_model(reports) is None:
+        log("No model trained successfully.")
+        return 1
+    log("All model results saved.")
+    return 0 if all(r["status"] == "ok" for r in reports) else 1
+
+if __name__ == "__main__":
+    raise SystemExit(main())
@@ -0,0 +1,100 @@
+import json
+import os
+import time
+import warnings
+import joblib
+import numpy as np
+import pandas as pd
+from statsmodels.tsa.arima.model import ARIMA
+
+warnings.filterwarnings('ignore')
+
+# === Config ===
+ARIMA_ORDER = (1, 1, 1)
+ARIMA_STATE_PATH = "GOLD_arima_state.pkl"
+ARIMA_FORECAST_PATH = "GOLD_arima_forecast.json"
+ARIMA_FORECAST_DAYS = 60
+ARIMA_REFIT_DAYS = float(os.environ.get("GOLD_ARIMA_REFIT_DAYS", "7"))  # full re-estimation schedule
+
+
+def fit_arima(values, order=ARIMA_ORDER, start_params=None):
+    # Positional data: the gold dates have gaps, and statsmodels cannot forecast
+    # or extend a date index without a frequency.
+    return ARIMA(np.asarray(values, dtype=np.float64), order=order).fit(start_params=start_params)
+
+
+def save_state(results, series: pd.Series, fitted_at: float, path: str = ARIMA_STATE_PATH):
+    """Persist the filter state with the bookkeeping needed to extend it later.
+
+    One pickle, swapped in with an atomic rename, so the results and the last
+    date they cover can never disagree.
+    """
+    state = {
+        "results": results,
+        "order": ARIMA_ORDER,
+        "last_date": series.index[-1],
+        "nobs": len(series),
+        "fitted_at": fitted_at,
+        "updated_at": time.time(),
+    }
+    tmp = f"{path}.tmp"
+    joblib.dump(state, tmp)
+    os.replace(tmp, path)
+    return state
+
+
+def load_state(path: str = ARIMA_STATE_PATH):
+    try:
+        return joblib.load(path)
+    except FileNotFoundError:
+        return None
+
+
+def refit_due(state, refit_days: float = ARIMA_REFIT_DAYS, now: float = None) -> bool:
+    now = time.time() if now is None else now
+    return state is None or state["order"] != ARIMA_ORDER or now - state["fitted_at"] > refit_days * 86400
+
+
+def full_refit(series: pd.Series, start_params=None):
+    results = fit_arima(series.to_numpy(), start_params=start_params)
+    return results, save_state(results, series, fitted_at=time.time())
+
+
+def refresh_arima(series: pd.Series, refit_days: float = ARIMA_REFIT_DAYS, force: bool = False) -> dict:
+    """Bring the persisted ARIMA state up to date with ``series``.
+
+    New observations after the stored ``last_date`` are run through the
+    existing Kalman filter with ``extend``. The parameters are not
+    re-estimated, so the cost scales with the number of new points. A full
+    refit runs instead on schedule (every ``refit_days``), on ``force``, or
+    when earlier history no longer matches what was fitted.
+    """
+    start = time.perf_counter()
+    state = load_state()
+    new = series[series.index > state["last_date"]] if state is not None else series
+    history_changed = state is not None and len(series) - len(new) != state["nobs"]
+
+    if force or history_changed or refit_due(state, refit_days):
+        results, state = full_refit(series, start_params=state["results"].params if state else None)
+        mode, n_new = "full", len(series)
+    elif len(new):
+        results = state["results"].extend(new.to_numpy(dtype=np.float64))
+        state = save_state(results, series, fitted_at=state["fitted_at"])
+        mode, n_new = "update", len(new)
+    else:
+        results, mode, n_new = state["results"], "noop", 0
+
+    save_forecast(results, state["last_date"])
+    return {"mode": mode, "points": n_new, "nobs": state["nobs"], "seconds": time.perf_counter() - start}
+
+
+def save_forecast(results, last_date, days: int = ARIMA_FORECAST_DAYS, path: str = ARIMA_FORECAST_PATH):
+    """Write the next ``days`` daily prices after ``last_date``."""
+    dates = pd.date_range(pd.Timestamp(last_date) + pd.Timedelta(days=1), periods=days, freq="D")
+    with open(path, "w") as f:
+        json.dump({
+            "model": "ARIMA",
+            "last_date": pd.Timestamp(last_date).strftime("%Y-%m-%d"),
+            "dates": dates.strftime("%Y-%m-%d").tolist(),
+            "predictions": np.asarray(results.forecast(steps=days)).tolist(),
+        }, f)
@@ -0,0 +1,28 @@
+import numpy as np
+import pandas as pd
+from common.dataset_cache import load_dataset
+
+# === Config ===
+DATA_PATH = "data.csv"
+TARGET_COLUMN = "24K - Global Price"
+CLEAN_VERSION = 1  # bump when clean_gold changes
+
+
+def clean_gold(df: pd.DataFrame) -> pd.DataFrame:
+    """Rows with a parseable date and target price, the target gap-filled by interpolation."""
+    df = df.dropna(subset=[TARGET_COLUMN])
+    df.columns = df.columns.str.strip()
+    df['Date'] = pd.to_datetime(df['Date'], errors='coerce')
+    df = df.dropna(subset=['Date']).reset_index(drop=True)
+    df[TARGET_COLUMN] = pd.to_numeric(df[TARGET_COLUMN], errors='coerce').interpolate(method='linear').ffill().bfill()
+    return df
+
+
+def load_gold_frame(path: str = DATA_PATH) -> pd.DataFrame:
+    return load_dataset(path, clean_gold, name="gold", version=CLEAN_VERSION)
+
+
+def load_gold_series(path: str = DATA_PATH) -> pd.Series:
+    """Date-indexed, gap-filled gold price series."""
+    df = load_gold_frame(path)
+    return pd.Series(df[TARGET_COLUMN].to_numpy(dtype=np.float64), index=pd.DatetimeIndex(df['Date'], name='Date'), name=TARGET_COLUMN)
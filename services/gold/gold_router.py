@@ -1,11 +1,11 @@
-from fastapi import APIRouter, HTTPException, Query
+from fastapi import APIRouter, HTTPException, Query, Request
 from pydantic import BaseModel
-import json
+from typing import Optional
 import numpy as np
-import pandas as pd
-from sklearn.metrics import mean_absolute_error, mean_squared_error, r2_score
-from sklearn.preprocessing import MinMaxScaler
-from tensorflow.keras.models import load_model
+from gold.lstm_runtime import get_lstm_forecaster
+from gold.results_cache import get_results_cache
+from common.encoding import negotiate, columnar_response
+from common.downsample import lttb_indices
 
 router = APIRouter()
 
@@ -14,6 +14,7 @@ class ForecastResponse(BaseModel):
     model: str
     predictions: list[float]
     actual: list[float]
+    index: Optional[list[int]] = None  # positions kept when downsampled
 
 class MetricResponse(BaseModel):
     model: str
@@ -30,26 +31,42 @@ class PredictResponse(BaseModel):
     days: int
     predictions: list[float]
 
-# === Load JSON Helper ===
-def load_json_file(filename):
-    try:
-        with open(filename, "r") as f:
-            return json.load(f)
-    except Exception as e:
-        raise HTTPException(status_code=500, detail=f"Error reading {filename}: {str(e)}")
+# === Downsampling ===
+def downsample_result(result, max_points):
+    """LTTB-downsample a results file's series, keeping predictions aligned with actuals."""
+    actual = result["actual_array"]
+    idx = lttb_indices(np.arange(len(actual)), actual, max_points)
+    return {
+        **result,
+        "predictions": result["predictions_array"][idx].tolist(),
+        "actual": actual[idx].tolist(),
+        "predictions_array": result["predictions_array"][idx],
+        "actual_array": actual[idx],
+        "index": idx.tolist(),
+    }
 
 # === /gold/forecast ===
 @router.get("/forecast", response_model=list[ForecastResponse])
-def get_all_gold_forecasts():
+def get_all_gold_forecasts(request: Request, format: str = Query(None),
+                           max_points: int = Query(None, ge=3, description="Downsample each series (LTTB)")):
     try:
-        arima = load_json_file("GOLD_arima_results.json")
-        prophet = load_json_file("GOLD_prophet_results.json")
-        lstm = load_json_file("GOLD_lstm_results.json")
+        results = get_results_cache().results()
+        if max_points:
+            results = {name: downsample_result(r, max_points) for name, r in results.items()}
+
+        media_type = negotiate(request.headers.get("accept"), format)
+        if media_type:
+            columns = {}
+            for name, data in results.items():
+                columns[f"{name}_predictions"] = data["predictions_array"]
+                columns[f"{name}_actual"] = data["actual_array"]
+                if "index" in data:
+                    columns[f"{name}_index"] = np.asarray(data["index"], dtype=np.float64)
+            return columnar_response(media_type, {"models": list(results)}, columns)
 
         return [
-            ForecastResponse(model="ARIMA", predictions=arima["predictions"], actual=arima["actual"]),
-            ForecastResponse(model="Prophet", predictions=prophet["predictions"], actual=prophet["actual"]),
-            ForecastResponse(model="LSTM", predictions=lstm["predictions"], actual=lstm["actual"]),
+            ForecastResponse(model=name, predictions=data["predictions"], actual=data["actual"], index=data.get("index"))
+            for name, data in results.items()
         ]
     except Exception as e:
         raise HTTPException(status_code=500, detail=f"Forecast fetch error: {str(e)}")
@@ -58,20 +75,7 @@ def get_all_gold_forecasts():
 @router.get("/metrics", response_model=list[MetricResponse])
 def get_model_metrics():
     try:
-        results = []
-        for model_name, filename in [
-            ("ARIMA", "GOLD_arima_results.json"),
-            ("Prophet", "GOLD_prophet_results.json"),
-            ("LSTM", "GOLD_lstm_results.json")
-        ]:
-            data = load_json_file(filename)
-            y_true = np.array(data["actual"])
-            y_pred = np.array(data["predictions"])
-            mae = float(mean_absolute_error(y_true, y_pred))
-            rmse = float(np.sqrt(mean_squared_error(y_true, y_pred)))
-            r2 = float(r2_score(y_true, y_pred))
-            results.append(MetricResponse(model=model_name, MAE=mae, RMSE=rmse, R2=r2))
-        return results
+        return [MetricResponse(model=name, **data["metrics"]) for name, data in get_results_cache().results().items()]
     except Exception as e:
         raise HTTPException(status_code=500, detail=f"Metric computation error: {str(e)}")
 
@@ -79,8 +83,7 @@ def get_model_metrics():
 @router.get("/best-model", response_model=BestModelResponse)
 def get_best_model():
     try:
-        best_model = load_json_file("GOLD_best_model.json")
-        return BestModelResponse(**best_model)
+        return BestModelResponse(**get_results_cache().best_model())
     except Exception as e:
         raise HTTPException(status_code=500, detail=f"Best model fetch error: {str(e)}")
 
@@ -88,22 +91,7 @@ def get_best_model():
 @router.get("/predict", response_model=PredictResponse)
 def predict_next_days(days: int = Query(15, ge=1, le=60)):
     try:
-        df = pd.read_csv("data.csv")
-        df["24K - Global Price"] = pd.to_numeric(df["24K - Global Price"], errors="coerce")
-        df["24K - Global Price"].fillna(df["24K - Global Price"].mean(), inplace=True)
-
-        scaler = MinMaxScaler()
-        scaled = scaler.fit_transform(df["24K - Global Price"].values.reshape(-1, 1))
-        window = scaled[-60:].reshape(1, 60, 1)
-
-        model = load_model("GOLD_lstm_model.keras")
-        pred_scaled = []
-        for _ in range(days):
-            pred = model.predict(window, verbose=0)[0][0]
-            pred_scaled.append(pred)
-            window = np.append(window[:, 1:, :], [[[pred]]], axis=1)
-
-        predictions = scaler.inverse_transform(np.array(pred_scaled).reshape(-1, 1)).flatten().tolist()
+        predictions = get_lstm_forecaster().predict(days)
         return PredictResponse(model="LSTM", days=days, predictions=predictions)
     except Exception as e:
         raise HTTPException(status_code=500, detail=f"Prediction error: {str(e)}")
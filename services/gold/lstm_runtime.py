@@ -0,0 +1,118 @@
+import os
+import threading
+import joblib
+import numpy as np
+from sklearn.preprocessing import MinMaxScaler
+import tensorflow as tf
+from tensorflow.keras.models import load_model
+from gold.dataset import DATA_PATH, TARGET_COLUMN, load_gold_frame
+
+# === Config ===
+MODEL_PATH = "GOLD_lstm_model.keras"
+SCALER_PATH = "GOLD_scaler.pkl"
+SEQUENCE_LENGTH = 60
+
+
+def _mtime(path):
+    try:
+        return os.stat(path).st_mtime_ns
+    except FileNotFoundError:
+        return None
+
+
+def compile_step(model, sequence_length: int = SEQUENCE_LENGTH):
+    """One forward pass as a traced graph function.
+
+    ``Model.predict`` builds a data pipeline and callbacks on every call, which
+    dominates a single-row step. The traced function runs the graph directly.
+    """
+    @tf.function(input_signature=[tf.TensorSpec((1, sequence_length, 1), tf.float32)])
+    def step(window):
+        return model(window, training=False)[0, 0]
+    return step
+
+
+def rollout(step, seed, days: int):
+    """Autoregressive forecast of ``days`` scaled values from ``seed`` (shape (1, L, 1)).
+
+    The window lives in a preallocated buffer of length 2L with every value
+    written twice, at ``pos`` and ``pos + L``. The current window is then always
+    the contiguous view ``buf[pos:pos + L]`` and nothing is shifted or reallocated.
+    """
+    length = seed.shape[1]
+    buf = np.empty(2 * length, dtype=np.float32)
+    buf[:length] = buf[length:] = seed.ravel()
+    out = np.empty(days, dtype=np.float32)
+    for i in range(days):
+        pos = i % length
+        pred = float(step(buf[pos:pos + length].reshape(1, length, 1)))
+        out[i] = buf[pos] = buf[pos + length] = pred
+    return out
+
+
+class LSTMForecaster:
+    """Keeps the gold LSTM, its scaler and the latest seed window in memory.
+
+    Each piece is reloaded only when its backing file changes: the Keras model
+    when ``model_path`` changes, the scaler and seed window when ``scaler_path``
+    or ``data_path`` changes. The scaler is the one persisted by
+    ``Gold_Forecasting.py``; older checkpoints without it fall back to fitting
+    one on the full series, as the endpoint used to on every call.
+    """
+
+    def __init__(self, model_path: str = MODEL_PATH, scaler_path: str = SCALER_PATH,
+                 data_path: str = DATA_PATH, sequence_length: int = SEQUENCE_LENGTH):
+        self.model_path = model_path
+        self.scaler_path = scaler_path
+        self.data_path = data_path
+        self.sequence_length = sequence_length
+        self._lock = threading.Lock()
+        self._model = None
+        self._step = None
+        self._model_version = None
+        self._scaler = None
+        self._seed = None
+        self._seed_version = None
+
+    def state(self):
+        """Return ``(step, scaler, seed)``; ``seed`` is the scaled last window, shape (1, L, 1)."""
+        model_version = _mtime(self.model_path)
+        if model_version is None:
+            raise FileNotFoundError(f"{self.model_path} not found; run Gold_Forecasting.py first")
+        seed_version = (_mtime(self.scaler_path), _mtime(self.data_path))
+
+        with self._lock:
+            if self._model_version != model_version:
+                self._model = load_model(self.model_path)
+                self._step = compile_step(self._model, self.sequence_length)
+                self._model_version = model_version
+            if self._seed_version != seed_version:
+                self._scaler, self._seed = self._load_seed()
+                self._seed_version = seed_version
+            return self._step, self._scaler, self._seed
+
+    def _load_seed(self):
+        prices = load_gold_frame(self.data_path)[TARGET_COLUMN].to_numpy(dtype=np.float64).reshape(-1, 1)
+
+        if os.path.exists(self.scaler_path):
+            scaler = joblib.load(self.scaler_path)
+        else:
+            scaler = MinMaxScaler().fit(prices)
+        seed = scaler.transform(prices[-self.sequence_length:]).reshape(1, self.sequence_length, 1)
+        return scaler, seed
+
+    def predict(self, days: int):
+        """Forecast ``days`` prices by feeding each prediction back into the window."""
+        step, scaler, seed = self.state()
+        pred_scaled = rollout(step, seed, days)
+        return scaler.inverse_transform(pred_scaled.reshape(-1, 1).astype(np.float64)).flatten().tolist()
+
+
+_forecaster = None
+
+
+def get_lstm_forecaster() -> LSTMForecaster:
+    global _forecaster
+    if _forecaster is None:
+        _forecaster = LSTMForecaster()
+    return _forecaster
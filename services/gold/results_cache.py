@@ -0,0 +1,108 @@
+import hashlib
+import json
+import os
+import threading
+import time
+import numpy as np
+from sklearn.metrics import mean_absolute_error, mean_squared_error, r2_score
+
+# === Config ===
+RESULT_FILES = {
+    "ARIMA": "GOLD_arima_results.json",
+    "Prophet": "GOLD_prophet_results.json",
+    "LSTM": "GOLD_lstm_results.json",
+}
+BEST_MODEL_FILE = "GOLD_best_model.json"
+# Files are stat()ed at most this often; requests in between are served from memory alone.
+RESULTS_CHECK_INTERVAL = float(os.environ.get("GOLD_RESULTS_CHECK_INTERVAL", "5"))
+
+
+def compute_metrics(actual, predictions) -> dict:
+    return {
+        "MAE": float(mean_absolute_error(actual, predictions)),
+        "RMSE": float(np.sqrt(mean_squared_error(actual, predictions))),
+        "R2": float(r2_score(actual, predictions)),
+    }
+
+
+class ResultsCache:
+    """Parsed gold results files and their metrics, held in memory.
+
+    A file is re-read only when its (mtime, size) signature changes, and
+    re-parsed only when the content hash changes too, so a touched but
+    identical file costs one read. Each model's MAE/RMSE/R2 is computed
+    once per parse.
+    """
+
+    def __init__(self, files: dict = RESULT_FILES, best_model_file: str = BEST_MODEL_FILE,
+                 check_interval: float = RESULTS_CHECK_INTERVAL):
+        self.files = dict(files)
+        self.best_model_file = best_model_file
+        self.check_interval = check_interval
+        self._entries = {}  # path -> {"signature", "digest", "value"}
+        self._checked = {}  # group -> monotonic time of the last stat() pass
+        self._lock = threading.Lock()
+
+    def results(self) -> dict:
+        """``{model: {"predictions", "actual", "predictions_array", "actual_array", "metrics"}}``."""
+        self._refresh("results", {path: self._parse_result for path in self.files.values()})
+        return {name: self._entries[path]["value"] for name, path in self.files.items()}
+
+    def best_model(self) -> dict:
+        # Checked on its own, so a missing or corrupt best-model file only fails /best-model.
+        self._refresh("best", {self.best_model_file: self._parse_best})
+        return self._entries[self.best_model_file]["value"]
+
+    def _refresh(self, group: str, parsers: dict):
+        now = time.monotonic()
+        if group in self._checked and now - self._checked[group] < self.check_interval:
+            return
+        with self._lock:
+            if group in self._checked and now - self._checked[group] < self.check_interval:
+                return
+            for path, parse in parsers.items():
+                self._load(path, parse)
+            self._checked[group] = now
+
+    def _load(self, path: str, parse):
+        try:
+            stat = os.stat(path)
+            signature = (stat.st_mtime_ns, stat.st_size)
+            entry = self._entries.get(path)
+            if entry is not None and entry["signature"] == signature:
+                return
+            with open(path, "rb") as f:
+                raw = f.read()
+            digest = hashlib.sha256(raw).hexdigest()
+            if entry is not None and entry["digest"] == digest:
+                entry["signature"] = signature
+                return
+            self._entries[path] = {"signature": signature, "digest": digest, "value": parse(json.loads(raw))}
+        except Exception as e:
+            raise RuntimeError(f"Error reading {path}: {str(e)}")
+
+    @staticmethod
+    def _parse_result(data: dict) -> dict:
+        actual = np.asarray(data["actual"], dtype=np.float64)
+        predictions = np.asarray(data["predictions"], dtype=np.float64)
+        return {
+            "predictions": data["predictions"],
+            "actual": data["actual"],
+            "predictions_array": predictions,
+            "actual_array": actual,
+            "metrics": compute_metrics(actual, predictions),
+        }
+
+    @staticmethod
+    def _parse_best(data: dict) -> dict:
+        return data
+
+
+_cache = None
+
+
+def get_results_cache() -> ResultsCache:
+    global _cache
+    if _cache is None:
+        _cache = ResultsCache()
+    return _cache
@@ -0,0 +1,68 @@
+import os
+import threading
+import numpy as np
+from sklearn.neighbors import KDTree
+from real_estate.dataset import DATA_PATH, load_listings
+
+# === Config ===
+FEATURES = ["Bedrooms", "Bathrooms", "Area"]
+LISTING_COLUMNS = ["Type", "Price", "Bedrooms", "Bathrooms", "Area", "City"]
+LEAF_SIZE = 40
+
+
+class ComparablesIndex:
+    """In-memory KD-tree over z-scored (Bedrooms, Bathrooms, Area) for nearest-listing lookups.
+
+    Built once from the listings cache and rebuilt on the first query after
+    the source CSV changes. Display columns are kept as plain arrays, so a
+    query is one tree search plus k array reads.
+    """
+
+    def __init__(self, data_path: str = DATA_PATH, leaf_size: int = LEAF_SIZE):
+        self.data_path = data_path
+        self.leaf_size = leaf_size
+        self._lock = threading.Lock()
+        self._version = None
+        self._tree = None
+        self._mean = None
+        self._std = None
+        self._columns = None
+
+    def _state(self):
+        version = os.stat(self.data_path).st_mtime_ns
+        with self._lock:
+            if self._version != version:
+                df = load_listings(self.data_path)
+                X = df[FEATURES].to_numpy(dtype=np.float64)
+                mean, std = X.mean(axis=0), X.std(axis=0)
+                std[std == 0] = 1.0
+                self._tree = KDTree((X - mean) / std, leaf_size=self.leaf_size)
+                self._mean, self._std = mean, std
+                self._columns = {c: df[c].to_numpy() for c in LISTING_COLUMNS if c in df.columns}
+                self._version = version
+            return self._tree, self._mean, self._std, self._columns
+
+    def query(self, bedrooms: float, bathrooms: float, area: float, k: int = 10):
+        """The ``k`` listings closest to the profile, nearest first, with their distances."""
+        tree, mean, std, columns = self._state()
+        point = (np.array([[bedrooms, bathrooms, area]], dtype=np.float64) - mean) / std
+        dist, idx = tree.query(point, k=min(k, tree.data.shape[0]))
+        out = []
+        for d, i in zip(dist[0].tolist(), idx[0].tolist()):
+            listing = {c: _plain(values[i]) for c, values in columns.items()}
+            out.append({"index": i, "distance": d, **listing})
+        return out
+
+
+def _plain(value):
+    return value.item() if isinstance(value, np.generic) else value
+
+
+_index = None
+
+
+def get_comparables_index() -> ComparablesIndex:
+    global _index
+    if _index is None:
+        _index = ComparablesIndex()
+    return _index
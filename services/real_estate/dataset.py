@@ -0,0 +1,24 @@
+import pandas as pd
+from common.dataset_cache import load_dataset
+
+# === Config ===
+DATA_PATH = "egypt_House_prices.csv"
+NUMERIC_COLUMNS = ["Price", "Bedrooms", "Bathrooms", "Area"]
+CLEAN_VERSION = 1  # bump when clean_listings changes
+
+
+def clean_listings(df: pd.DataFrame) -> pd.DataFrame:
+    """Numeric listing fields coerced and filled (mean for Price/Area, median for rooms), plus a Date column."""
+    for column in NUMERIC_COLUMNS:
+        df[column] = pd.to_numeric(df[column], errors='coerce')
+    df['Price'] = df['Price'].fillna(df['Price'].mean())
+    df['Bedrooms'] = df['Bedrooms'].fillna(df['Bedrooms'].median())
+    df['Bathrooms'] = df['Bathrooms'].fillna(df['Bathrooms'].median())
+    df['Area'] = df['Area'].fillna(df['Area'].mean())
+    if 'Date' not in df.columns:
+        df['Date'] = pd.date_range(start='2022-01-01', periods=len(df), freq='D')
+    return df
+
+
+def load_listings(path: str = DATA_PATH) -> pd.DataFrame:
+    return load_dataset(path, clean_listings, name="egypt_house_prices", version=CLEAN_VERSION)
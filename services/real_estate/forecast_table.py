@@ -0,0 +1,72 @@
+import os
+import threading
+import numpy as np
+from sklearn.preprocessing import MinMaxScaler
+from tensorflow.keras.models import load_model
+from real_estate.dataset import DATA_PATH, load_listings
+
+# === Config ===
+MODEL_PATH = "REAL_lstm_forecast_model.keras"
+SEQUENCE_LENGTH = 60
+MAX_HORIZON = 60  # the /predict `days` upper bound
+
+
+def _mtime(path):
+    try:
+        return os.stat(path).st_mtime_ns
+    except FileNotFoundError:
+        return None
+
+
+def rollout(model, prices, sequence_length: int = SEQUENCE_LENGTH, days: int = MAX_HORIZON):
+    """``days`` autoregressive LSTM predictions from the last ``sequence_length`` prices."""
+    scaler = MinMaxScaler()
+    scaled = scaler.fit_transform(np.asarray(prices, dtype=np.float64).reshape(-1, 1))
+    window = scaled[-sequence_length:].reshape(1, sequence_length, 1)
+    predictions_scaled = []
+    for _ in range(days):
+        pred = model.predict(window, verbose=0)[0][0]
+        predictions_scaled.append(pred)
+        window = np.append(window[:, 1:, :], [[[pred]]], axis=1)
+    return scaler.inverse_transform(np.array(predictions_scaled).reshape(-1, 1)).flatten()
+
+
+class HorizonTable:
+    """The full ``MAX_HORIZON``-day real-estate forecast, computed once per model/data version.
+
+    The rollout is deterministic for a given model and dataset, so a shorter
+    horizon is just a prefix of the longest one. The table is rebuilt on the
+    first request after either file's mtime changes.
+    """
+
+    def __init__(self, model_path: str = MODEL_PATH, data_path: str = DATA_PATH, max_horizon: int = MAX_HORIZON):
+        self.model_path = model_path
+        self.data_path = data_path
+        self.max_horizon = max_horizon
+        self._lock = threading.Lock()
+        self._version = None
+        self._predictions = None
+
+    def predictions(self, days: int) -> list:
+        if days > self.max_horizon:
+            raise ValueError(f"days must be at most {self.max_horizon}")
+        version = (_mtime(self.model_path), _mtime(self.data_path))
+        if version[0] is None:
+            raise FileNotFoundError(f"{self.model_path} not found; run Real_Estate_Forecasting.py first")
+        with self._lock:
+            if self._version != version:
+                model = load_model(self.model_path)
+                prices = load_listings(self.data_path)["Price"]
+                self._predictions = rollout(model, prices, days=self.max_horizon).tolist()
+                self._version = version
+            return self._predictions[:days]
+
+
+_table = None
+
+
+def get_horizon_table() -> HorizonTable:
+    global _table
+    if _table is None:
+        _table = HorizonTable()
+    return _table
@@ -0,0 +1,299 @@
+import hashlib
+import itertools
+import json
+import multiprocessing
+import os
+import time
+import warnings
+import numpy as np
+from multiprocessing.connection import wait
+from statsmodels.tsa.statespace.sarimax import SARIMAX
+
+warnings.filterwarnings('ignore')
+
+# === Config ===
+ORDER_P = (0, 1, 2)
+ORDER_Q = (0, 1, 2)
+ORDER_D = 1
+SEASONAL_P = (0, 1)
+SEASONAL_Q = (0, 1)
+SEASONAL_D = 1
+SEASONAL_PERIOD = 12
+SEARCH_IC = os.environ.get("REAL_ORDER_SEARCH_IC", "aic")  # "aic" or "bic"
+SEARCH_BUDGET = float(os.environ.get("REAL_ORDER_SEARCH_BUDGET", "900"))  # seconds for the whole search
+# Each worker holds a full SARIMAX fit in memory, so the default stays small on large hosts.
+SEARCH_WORKERS = int(os.environ.get("REAL_ORDER_SEARCH_WORKERS", str(min(os.cpu_count() or 1, 4))))
+FIT_TIMEOUT = float(os.environ.get("REAL_ORDER_SEARCH_FIT_TIMEOUT", "120"))  # seconds per candidate fit
+SCREEN_POINTS = int(os.environ.get("REAL_ORDER_SEARCH_SCREEN_POINTS", "2000"))
+SEARCH_KEEP = 3  # finalists per family refit on the full series
+PRUNE_DELTA = 10.0  # screening IC gap beyond which a candidate is dropped
+FIT_MAXITER = 50
+CACHE_DIR = os.path.join(".cache", "order_search")
+
+
+def candidate_orders():
+    """``{family: [(order, seasonal_order), ...]}`` for the non-seasonal and seasonal grids.
+
+    Candidates are only ranked against their own family: the seasonal
+    difference changes the data the likelihood is computed on, so ICs are
+    not comparable across families.
+    """
+    arima = [((p, ORDER_D, q), (0, 0, 0, 0)) for p, q in itertools.product(ORDER_P, ORDER_Q)]
+    sarima = [((p, ORDER_D, q), (P, SEASONAL_D, Q, SEASONAL_PERIOD))
+              for p, q, P, Q in itertools.product(ORDER_P, ORDER_Q, SEASONAL_P, SEASONAL_Q)]
+    return {"ARIMA": arima, "SARIMA": sarima}
+
+
+def data_hash(values) -> str:
+    return hashlib.sha256(np.ascontiguousarray(values, dtype=np.float64).tobytes()).hexdigest()
+
+
+def _key(order, seasonal_order) -> str:
+    return f"{','.join(map(str, order))}|{','.join(map(str, seasonal_order))}"
+
+
+def fit_candidate(values, order, seasonal_order, maxiter: int = FIT_MAXITER, low_memory: bool = False) -> dict:
+    """Fit one candidate; returns a small picklable report (never the results object)."""
+    start = time.perf_counter()
+    try:
+        results = SARIMAX(values, order=order, seasonal_order=seasonal_order).fit(
+            disp=False, maxiter=maxiter, low_memory=low_memory)
+        converged = bool(results.mle_retvals.get("converged", True))
+        return {"order": list(order), "seasonal_order": list(seasonal_order),
+                "status": "ok" if converged else "not_converged",
+                "aic": float(results.aic), "bic": float(results.bic), "params": results.params.tolist(),
+                "seconds": time.perf_counter() - start}
+    except Exception as e:
+        return {"order": list(order), "seasonal_order": list(seasonal_order), "status": "error",
+                "error": str(e), "seconds": time.perf_counter() - start}
+
+
+class _ReportCache:
+    """Candidate reports on disk, keyed by (data hash, order, seasonal order)."""
+
+    def __init__(self, digest: str, cache_dir: str = CACHE_DIR):
+        self.path = os.path.join(cache_dir, f"{digest[:16]}-{FIT_MAXITER}.json")
+        try:
+            with open(self.path) as f:
+                self.reports = json.load(f)
+        except FileNotFoundError:
+            self.reports = {}
+
+    def get(self, order, seasonal_order):
+        report = self.reports.get(_key(order, seasonal_order))
+        return dict(report, cached=True) if report else None
+
+    def put(self, report):
+        # Skips and timeouts depend on the budget and the host, not on the data.
+        if report["status"] not in ("skipped", "timeout"):
+            self.reports[_key(report["order"], report["seasonal_order"])] = report
+
+    def save(self):
+        os.makedirs(os.path.dirname(self.path), exist_ok=True)
+        tmp = f"{self.path}.tmp-{os.getpid()}"
+        with open(tmp, "w") as f:
+            json.dump(self.reports, f)
+        os.replace(tmp, self.path)
+
+
+def _fit_worker(conn):
+    """Worker loop: fit each ``(values, order, seasonal_order, low_memory)`` task it receives."""
+    warnings.filterwarnings('ignore')
+    conn.send("ready")  # imports are done; fit timeouts start from here
+    while True:
+        task = conn.recv()
+        if task is None:
+            return
+        values, order, seasonal_order, low_memory = task
+        conn.send(fit_candidate(values, order, seasonal_order, low_memory=low_memory))
+
+
+class _Slot:
+    """One spawned fit worker; killed and replaced when a fit overruns its timeout."""
+
+    def __init__(self, context):
+        self.conn, child = context.Pipe()
+        self.process = context.Process(target=_fit_worker, args=(child,), daemon=True)
+        self.process.start()
+        child.close()
+        self.ready = False
+        self.candidate = None
+        self.started = None
+
+    def submit(self, values, candidate, low_memory):
+        self.candidate = candidate
+        self.started = time.monotonic()
+        self.conn.send((values, *candidate, low_memory))
+
+    def kill(self):
+        self.process.terminate()
+        self.process.join()
+        self.conn.close()
+
+    def close(self):
+        if not self.ready or self.candidate:  # still importing or fitting: nothing left to wait for
+            self.kill()
+            return
+        try:
+            self.conn.send(None)
+        except OSError:
+            pass
+        self.process.join(timeout=5)
+        if self.process.is_alive():
+            self.process.terminate()
+        self.conn.close()
+
+
+def _stopped(candidate, status, error, seconds=0.0):
+    order, seasonal_order = candidate
+    return {"order": list(order), "seasonal_order": list(seasonal_order), "status": status,
+            "error": error, "seconds": seconds}
+
+
+def _run_stage(values, candidates, deadline, workers, log=None, low_memory=False, fit_timeout=FIT_TIMEOUT):
+    """Fit ``candidates`` on ``values`` in spawned worker processes until ``deadline``.
+
+    Cached reports are reused. A fit running longer than ``fit_timeout`` seconds,
+    or past ``deadline``, is killed and reported as ``timeout``; candidates not
+    started by ``deadline`` are reported as ``skipped``.
+    """
+    cache = _ReportCache(data_hash(values))
+    reports, pending = [], []
+    for order, seasonal_order in candidates:
+        cached = cache.get(order, seasonal_order)
+        if cached is not None:
+            reports.append(cached)
+        else:
+            pending.append((order, seasonal_order))
+    if not pending:
+        return reports
+
+    def record(report):
+        reports.append(report)
+        cache.put(report)
+        if log:
+            log(_format_report(report))
+
+    # Spawned, not forked: the training scripts have TensorFlow imported.
+    context = multiprocessing.get_context("spawn")
+    slots = []
+    try:
+        while pending or any(slot.candidate for slot in slots):
+            if time.monotonic() >= deadline:
+                for candidate in pending:
+                    record(_stopped(candidate, "skipped", "time budget exhausted"))
+                pending = []
+            for slot in slots:
+                if pending and slot.ready and not slot.candidate:
+                    slot.submit(values, pending.pop(0), low_memory)
+            starting = [s for s in slots if not s.ready]
+            while len(slots) < workers and len(starting) < len(pending):
+                slots.append(_Slot(context))
+                starting.append(slots[-1])
+
+            busy = [s for s in slots if s.candidate]
+            if not busy and not starting:
+                continue
+            limit = min([s.started + fit_timeout for s in busy] + [deadline])
+            ready = wait([s.conn for s in busy + starting], timeout=max(limit - time.monotonic(), 0))
+            for slot in starting + busy:
+                if slot.conn in ready:
+                    try:
+                        message = slot.conn.recv()
+                    except EOFError:  # the worker died (native crash, OOM kill)
+                        if slot.candidate:
+                            record(_stopped(slot.candidate, "error", "worker process died",
+                                            time.monotonic() - slot.started))
+                        slot.kill()
+                        slots.remove(slot)
+                        continue
+                    if not slot.ready:
+                        slot.ready = True
+                    else:
+                        record(message)
+                        slot.candidate = None
+                    continue
+                if not slot.candidate:
+                    continue
+                now = time.monotonic()
+                if now - slot.started >= fit_timeout or now >= deadline:
+                    reason = "fit timeout" if now - slot.started >= fit_timeout else "time budget exhausted"
+                    record(_stopped(slot.candidate, "timeout", reason, now - slot.started))
+                    slot.kill()
+                    slots.remove(slot)
+    finally:
+        for slot in slots:
+            if slot.candidate:
+                slot.kill()
+            else:
+                slot.close()
+        cache.save()
+    return reports
+
+
+def _in_family(reports, candidates):
+    keys = {_key(o, s) for o, s in candidates}
+    return [r for r in reports if _key(r["order"], r["seasonal_order"]) in keys]
+
+
+def _rank(reports, ic):
+    ok = [r for r in reports if r["status"] == "ok"]
+    return sorted(ok, key=lambda r: r[ic])
+
+
+def search_orders(values, ic: str = SEARCH_IC, budget: float = SEARCH_BUDGET, workers: int = SEARCH_WORKERS,
+                  screen_points: int = SCREEN_POINTS, keep: int = SEARCH_KEEP, prune_delta: float = PRUNE_DELTA,
+                  fit_timeout: float = FIT_TIMEOUT, log=None) -> dict:
+    """Two-stage (screen, then refit) order search over ``candidate_orders()``.
+
+    1. Every candidate is fitted on the last ``screen_points`` observations.
+    2. Per family, candidates that failed, did not converge, or whose IC is
+       more than ``prune_delta`` worse than the family's best are pruned. The
+       best ``keep`` of the rest are refitted on the full series and ranked.
+
+    All fits share one ``budget`` in seconds and each is killed after
+    ``fit_timeout`` seconds. Screening fits use ``low_memory``, which keeps
+    only what the IC ranking needs. Reports are cached per
+    (data hash, order), so re-running on unchanged data fits nothing. Every
+    candidate report carries its fit ``seconds``.
+    """
+    values = np.asarray(values, dtype=np.float64)
+    start = time.perf_counter()
+    deadline = time.monotonic() + budget
+    families = candidate_orders()
+
+    screen_values = values[-screen_points:] if 0 < screen_points < len(values) else values
+    screened = _run_stage(screen_values, [c for cands in families.values() for c in cands], deadline, workers, log,
+                          low_memory=True, fit_timeout=fit_timeout)
+
+    finalists = {}
+    for family, cands in families.items():
+        ranked = _rank(_in_family(screened, cands), ic)
+        if ranked:
+            ranked = [r for r in ranked if r[ic] - ranked[0][ic] <= prune_delta][:keep]
+        finalists[family] = [(tuple(r["order"]), tuple(r["seasonal_order"])) for r in ranked]
+
+    full = _run_stage(values, [c for cands in finalists.values() for c in cands], deadline, workers, log,
+                      fit_timeout=fit_timeout)
+    result = {"ic": ic, "screen_points": len(screen_values), "nobs": len(values),
+              "seconds": time.perf_counter() - start, "families": {}}
+    for family, cands in finalists.items():
+        ranked = _rank(_in_family(full, cands), ic)
+        result["families"][family] = {"best": ranked[0] if ranked else None, "finalists": ranked,
+                                      "screened": _in_family(screened, families[family])}
+    return result
+
+
+def filter_best(values, best: dict):
+    """Results for a searched order, from its cached parameters: one filter pass, no re-estimation."""
+    model = SARIMAX(np.asarray(values, dtype=np.float64), order=tuple(best["order"]),
+                    seasonal_order=tuple(best["seasonal_order"]))
+    return model.filter(np.asarray(best["params"]))
+
+
+def _format_report(report):
+    label = f"order={tuple(report['order'])} seasonal={tuple(report['seasonal_order'])}"
+    if report["status"] == "ok":
+        return f"✅ {label} aic={report['aic']:.1f} bic={report['bic']:.1f} in {report['seconds']:.2f}s"
+    return f"❌ {label} {report['status']} after {report['seconds']:.2f}s" + \
+        (f": {report['error']}" if report.get("error") else "")
@@ -1,10 +1,11 @@
-from fastapi import APIRouter, HTTPException, Query
+from fastapi import APIRouter, HTTPException, Query, Request
 from pydantic import BaseModel
+from typing import Optional
 import json
 import numpy as np
-from tensorflow.keras.models import load_model
-from sklearn.preprocessing import MinMaxScaler
-import pandas as pd
+from common.encoding import negotiate, columnar_response
+from real_estate.forecast_table import get_horizon_table
+from real_estate.comparables import get_comparables_index
 
 router = APIRouter()
 
@@ -27,11 +28,31 @@ class PredictResponse(BaseModel):
     days: int
     predictions: list[float]
 
+class Listing(BaseModel):
+    index: int
+    distance: float
+    Type: Optional[str] = None
+    Price: float
+    Bedrooms: float
+    Bathrooms: float
+    Area: float
+    City: Optional[str] = None
+
+class ComparablesResponse(BaseModel):
+    bedrooms: float
+    bathrooms: float
+    area: float
+    comparables: list[Listing]
+
 @router.get("/forecast", response_model=list[ForecastResponse])
-def get_forecasts():
+def get_forecasts(request: Request, format: str = Query(None)):
     try:
         with open("REAL_forecast_results.json", "r") as f:
             results = json.load(f)
+        media_type = negotiate(request.headers.get("accept"), format)
+        if media_type:
+            columns = {f"{m}_forecast": np.asarray(d["Forecast"], dtype=np.float64) for m, d in results.items()}
+            return columnar_response(media_type, {"models": list(results)}, columns)
         return [ForecastResponse(model=m, forecast=d["Forecast"]) for m, d in results.items()]
     except Exception as e:
         raise HTTPException(status_code=500, detail=f"Forecast error: {str(e)}")
@@ -61,29 +82,17 @@ def get_best_model():
 @router.get("/predict", response_model=PredictResponse)
 def predict(days: int = Query(15, ge=1, le=60)):
     try:
-        # Load model
-        model = load_model("REAL_lstm_forecast_model.keras")
-
-        # Load data
-        df = pd.read_csv("egypt_House_prices.csv")
-        df["Price"] = pd.to_numeric(df["Price"], errors="coerce")
-        df["Price"].fillna(df["Price"].mean(), inplace=True)
-
-        # Scale
-        scaler = MinMaxScaler()
-        scaled = scaler.fit_transform(df["Price"].values.reshape(-1, 1))
-
-        # Get last 60 days as seed
-        window = scaled[-60:].reshape(1, 60, 1)
-        predictions_scaled = []
-
-        for _ in range(days):
-            pred = model.predict(window)[0][0]
-            predictions_scaled.append(pred)
-            window = np.append(window[:, 1:, :], [[[pred]]], axis=1)
-
-        predictions = scaler.inverse_transform(np.array(predictions_scaled).reshape(-1, 1)).flatten().tolist()
+        predictions = get_horizon_table().predictions(days)
         return PredictResponse(model="LSTM", days=days, predictions=predictions)
 
     except Exception as e:
         raise HTTPException(status_code=500, detail=f"Prediction error: {str(e)}")
+
+@router.get("/comparables", response_model=ComparablesResponse)
+def comparables(bedrooms: float = Query(..., ge=0), bathrooms: float = Query(..., ge=0),
+                area: float = Query(..., gt=0), k: int = Query(10, ge=1, le=100)):
+    try:
+        listings = get_comparables_index().query(bedrooms, bathrooms, area, k)
+        return ComparablesResponse(bedrooms=bedrooms, bathrooms=bathrooms, area=area, comparables=listings)
+    except Exception as e:
+        raise HTTPException(status_code=500, detail=f"Comparables error: {str(e)}")
@@ -0,0 +1,317 @@
+import io
+import json
+import os
+import shutil
+import tempfile
+import threading
+import time
+import zlib
+import joblib
+import pandas as pd
+
+try:
+    import fcntl
+except ImportError:  # non-POSIX: in-process locking only
+    fcntl = None
+
+# === Config ===
+ARTIFACT_STORE = os.environ.get("STOCK_ARTIFACT_STORE", "files")  # "files" or "sharded"
+ARTIFACT_DIR = os.environ.get("STOCK_ARTIFACT_DIR", "checkpoints")
+ARTIFACT_SHARDS = int(os.environ.get("STOCK_ARTIFACT_SHARDS", "64"))
+
+KINDS = ("model", "scaler", "predictions")
+
+
+class FileArtifactStore:
+    """One ``{symbol}_rf_model.pkl`` / ``_scaler.pkl`` / ``_future_predictions.csv`` triple per symbol.
+
+    The original checkpoint layout, fine for a few dozen symbols. Each save
+    writes a complete triple into a new version directory ``{symbol}/{version}/``
+    and then atomically replaces the ``{symbol}.current`` pointer, so readers
+    always see a matching model and scaler. Flat triples from before the
+    pointer existed are still read when a symbol has no pointer.
+    """
+
+    FILES = {"model": "_rf_model.pkl", "scaler": "_scaler.pkl", "predictions": "_future_predictions.csv"}
+    KEEP_VERSIONS = 2  # the current version plus the one a concurrent reader may still be loading
+
+    def __init__(self, root: str = ARTIFACT_DIR):
+        self.root = root
+        os.makedirs(root, exist_ok=True)
+
+    @property
+    def spec(self):
+        return ("files", self.root)
+
+    def path(self, symbol: str, kind: str, version: str = None) -> str:
+        if version is None:
+            version = self._current(symbol)
+        if version is None:
+            return os.path.join(self.root, f"{symbol}{self.FILES[kind]}")
+        return os.path.join(self.root, symbol, version, f"{symbol}{self.FILES[kind]}")
+
+    def save(self, symbol: str, model, scaler, predictions: pd.DataFrame):
+        symbol_dir = os.path.join(self.root, symbol)
+        os.makedirs(symbol_dir, exist_ok=True)
+        staging = tempfile.mkdtemp(dir=symbol_dir, prefix=".tmp-")
+        try:
+            joblib.dump(model, os.path.join(staging, f"{symbol}{self.FILES['model']}"))
+            joblib.dump(scaler, os.path.join(staging, f"{symbol}{self.FILES['scaler']}"))
+            predictions.to_csv(os.path.join(staging, f"{symbol}{self.FILES['predictions']}"), index=False)
+            version = f"{time.time_ns():020d}"
+            os.rename(staging, os.path.join(symbol_dir, version))
+        except BaseException:
+            shutil.rmtree(staging, ignore_errors=True)
+            raise
+        # The pointer swap is the only step readers can observe.
+        tmp = _stage(self.root, lambda f: f.write(version.encode()))
+        os.replace(tmp, self._pointer(symbol))
+        self._prune(symbol_dir)
+
+    def info(self, symbol: str):
+        """``{"version", "trained_at", "bytes"}`` for a fully trained symbol, else None."""
+        version = self._current(symbol)
+        try:
+            stats = [os.stat(self.path(symbol, kind, version)) for kind in KINDS]
+        except FileNotFoundError:
+            return None
+        return {
+            "version": version or tuple(s.st_mtime_ns for s in stats[:2]),
+            "trained_at": stats[0].st_mtime,
+            "bytes": stats[0].st_size + stats[1].st_size,
+        }
+
+    def load(self, symbol: str):
+        version = self._current(symbol)
+        return joblib.load(self.path(symbol, "model", version)), joblib.load(self.path(symbol, "scaler", version))
+
+    def predictions(self, symbol: str) -> pd.DataFrame:
+        return pd.read_csv(self.path(symbol, "predictions"))
+
+    def symbols(self):
+        suffixes = (".current", self.FILES["model"])
+        return sorted({name[:-len(suffix)] for name in os.listdir(self.root)
+                       for suffix in suffixes if name.endswith(suffix)})
+
+    def _pointer(self, symbol: str) -> str:
+        return os.path.join(self.root, f"{symbol}.current")
+
+    def _current(self, symbol: str):
+        try:
+            with open(self._pointer(symbol)) as f:
+                return f.read().strip() or None
+        except FileNotFoundError:
+            return None
+
+    def _prune(self, symbol_dir: str):
+        versions = sorted(name for name in os.listdir(symbol_dir) if not name.startswith("."))
+        for name in versions[:-self.KEEP_VERSIONS]:
+            shutil.rmtree(os.path.join(symbol_dir, name), ignore_errors=True)
+
+
+class ShardedArtifactStore:
+    """Artifacts for thousands of symbols packed into ``n_shards`` append-only files.
+
+    A symbol hashes (crc32) to one shard. Each shard has a data file of
+    concatenated blobs and a small JSON index of ``key -> [offset, length,
+    written_at]``. A save appends the symbol's blobs, then atomically replaces
+    the index, so readers see either the old or the new artifact set. Lookups
+    are a cached dict hit plus one ``pread``. A shard is compacted into a new
+    data file once more than half of it is dead bytes.
+    """
+
+    def __init__(self, root: str = ARTIFACT_DIR, n_shards: int = ARTIFACT_SHARDS):
+        self.root = root
+        self.n_shards = n_shards
+        self._locks = [threading.Lock() for _ in range(n_shards)]
+        self._indexes = {}
+        os.makedirs(root, exist_ok=True)
+
+    @property
+    def spec(self):
+        return ("sharded", self.root, self.n_shards)
+
+    def shard(self, symbol: str) -> int:
+        return zlib.crc32(symbol.encode()) % self.n_shards
+
+    # === Writes ===
+    def save(self, symbol: str, model, scaler, predictions: pd.DataFrame):
+        blobs = {
+            "model": _dumps(model),
+            "scaler": _dumps(scaler),
+            "predictions": predictions.to_csv(index=False).encode(),
+        }
+        shard = self.shard(symbol)
+        with self._shard_lock(shard):
+            index = self._read_index(shard)
+            data_path = os.path.join(self.root, index["data"])
+            with open(data_path, "ab") as f:
+                offset = f.tell()
+                now = time.time()
+                for kind in KINDS:
+                    f.write(blobs[kind])
+                    index["entries"][f"{symbol}:{kind}"] = [offset, len(blobs[kind]), now]
+                    offset += len(blobs[kind])
+                f.flush()
+                os.fsync(f.fileno())
+            self._write_index(shard, index)
+            if offset > 2 * self._live_bytes(index) and offset > 1 << 20:
+                self._compact(shard, index)
+
+    # === Reads ===
+    def info(self, symbol: str):
+        entries = self._index(self.shard(symbol))["entries"]
+        records = [entries.get(f"{symbol}:{kind}") for kind in KINDS]
+        if any(r is None for r in records):
+            return None
+        return {
+            "version": (records[0][0], records[1][0], records[0][2]),
+            "trained_at": records[0][2],
+            "bytes": records[0][1] + records[1][1],
+        }
+
+    def load(self, symbol: str):
+        return _loads(self._read(symbol, "model")), _loads(self._read(symbol, "scaler"))
+
+    def predictions(self, symbol: str) -> pd.DataFrame:
+        return pd.read_csv(io.BytesIO(self._read(symbol, "predictions")))
+
+    def symbols(self):
+        out = []
+        for shard in range(self.n_shards):
+            out.extend(key[:-len(":model")] for key in self._index(shard)["entries"] if key.endswith(":model"))
+        return sorted(out)
+
+    def _read(self, symbol: str, kind: str) -> bytes:
+        shard = self.shard(symbol)
+        for attempt in range(2):
+            index = self._index(shard)
+            record = index["entries"].get(f"{symbol}:{kind}")
+            if record is None:
+                raise FileNotFoundError(f"No {kind} artifact for {symbol}")
+            try:
+                fd = os.open(os.path.join(self.root, index["data"]), os.O_RDONLY)
+            except FileNotFoundError:
+                # The shard was compacted after we cached its index; reload once.
+                self._indexes.pop(shard, None)
+                continue
+            try:
+                return os.pread(fd, record[1], record[0])
+            finally:
+                os.close(fd)
+        raise FileNotFoundError(f"No {kind} artifact for {symbol}")
+
+    # === Index Handling ===
+    def _index_path(self, shard: int) -> str:
+        return os.path.join(self.root, f"shard-{shard:04d}.idx.json")
+
+    def _index(self, shard: int) -> dict:
+        """Index for ``shard``, re-read only when its file changed."""
+        path = self._index_path(shard)
+        try:
+            version = os.stat(path).st_mtime_ns
+        except FileNotFoundError:
+            return {"data": f"shard-{shard:04d}.0.bin", "generation": 0, "entries": {}}
+        cached = self._indexes.get(shard)
+        if cached is not None and cached[0] == version:
+            return cached[1]
+        index = self._read_index(shard)
+        self._indexes[shard] = (version, index)
+        return index
+
+    def _read_index(self, shard: int) -> dict:
+        try:
+            with open(self._index_path(shard)) as f:
+                return json.load(f)
+        except FileNotFoundError:
+            return {"data": f"shard-{shard:04d}.0.bin", "generation": 0, "entries": {}}
+
+    def _write_index(self, shard: int, index: dict):
+        tmp = _stage(self.root, lambda f: f.write(json.dumps(index).encode()))
+        os.replace(tmp, self._index_path(shard))
+
+    def _live_bytes(self, index: dict) -> int:
+        return sum(length for _, length, _ in index["entries"].values())
+
+    def _compact(self, shard: int, index: dict):
+        old_path = os.path.join(self.root, index["data"])
+        generation = index["generation"] + 1
+        new_name = f"shard-{shard:04d}.{generation}.bin"
+        entries = {}
+        with open(old_path, "rb") as src, open(os.path.join(self.root, new_name), "wb") as dst:
+            for key, (offset, length, written_at) in sorted(index["entries"].items(), key=lambda kv: kv[1][0]):
+                src.seek(offset)
+                entries[key] = [dst.tell(), length, written_at]
+                dst.write(src.read(length))
+            dst.flush()
+            os.fsync(dst.fileno())
+        self._write_index(shard, {"data": new_name, "generation": generation, "entries": entries})
+        os.remove(old_path)
+
+    def _shard_lock(self, shard: int):
+        return _ShardLock(self._locks[shard], os.path.join(self.root, f"shard-{shard:04d}.lock"))
+
+
+class _ShardLock:
+    """Thread lock plus an advisory file lock, so training processes can share a shard."""
+
+    def __init__(self, lock, path):
+        self.lock = lock
+        self.path = path
+        self.fd = None
+
+    def __enter__(self):
+        self.lock.acquire()
+        if fcntl is not None:
+            self.fd = os.open(self.path, os.O_CREAT | os.O_RDWR, 0o644)
+            fcntl.flock(self.fd, fcntl.LOCK_EX)
+        return self
+
+    def __exit__(self, *exc):
+        if self.fd is not None:
+            fcntl.flock(self.fd, fcntl.LOCK_UN)
+            os.close(self.fd)
+            self.fd = None
+        self.lock.release()
+
+
+def _stage(root: str, write):
+    """Run ``write`` against a fresh temp file in ``root`` and return its path."""
+    fd, tmp = tempfile.mkstemp(dir=root, prefix=".tmp-")
+    try:
+        with os.fdopen(fd, "wb") as f:
+            write(f)
+        os.chmod(tmp, 0o644)
+    except BaseException:
+        os.remove(tmp)
+        raise
+    return tmp
+
+
+def _dumps(obj) -> bytes:
+    buf = io.BytesIO()
+    joblib.dump(obj, buf)
+    return buf.getvalue()
+
+
+def _loads(data: bytes):
+    return joblib.load(io.BytesIO(data))
+
+
+def make_artifact_store(kind: str = ARTIFACT_STORE, root: str = ARTIFACT_DIR, n_shards: int = ARTIFACT_SHARDS):
+    if kind == "files":
+        return FileArtifactStore(root)
+    if kind == "sharded":
+        return ShardedArtifactStore(root, n_shards)
+    raise ValueError(f"Unknown artifact store: {kind}")
+
+
+_stores = {}
+
+
+def get_artifact_store(spec=None):
+    """Process-wide store for ``spec`` (defaults to the ``STOCK_ARTIFACT_*`` config)."""
+    spec = tuple(spec) if spec else (ARTIFACT_STORE, ARTIFACT_DIR, ARTIFACT_SHARDS)
+    if spec not in _stores:
+        _stores[spec] = make_artifact_store(*spec)
+    return _stores[spec]
@@ -0,0 +1,33 @@
+import os
+from sklearn.ensemble import RandomForestRegressor, HistGradientBoostingRegressor
+from sklearn.linear_model import Ridge
+
+# === Config ===
+MODEL_BACKEND = os.environ.get("STOCK_MODEL_BACKEND", "rf")
+
+# Every backend is a regressor over the scaled (SMA_50, EMA_20) features so the
+# recursive forecast, registry and serving code stay backend-agnostic.
+BACKENDS = {
+    "rf": (RandomForestRegressor, {"n_estimators": 100, "random_state": 42}),
+    "hgb": (HistGradientBoostingRegressor, {"max_iter": 200, "random_state": 42}),
+    "ridge": (Ridge, {"alpha": 1e-3}),
+}
+BACKEND_LABELS = {"rf": "Random Forest", "hgb": "Gradient Boosting", "ridge": "Ridge"}
+
+
+def make_model(backend: str = MODEL_BACKEND):
+    if backend not in BACKENDS:
+        raise ValueError(f"Unknown model backend: {backend} (choose from {', '.join(BACKENDS)})")
+    cls, params = BACKENDS[backend]
+    return cls(**params)
+
+
+def describe_model(model) -> dict:
+    """Backend-independent summary used by ``/stock/metrics``."""
+    backend = next((name for name, (cls, _) in BACKENDS.items() if type(model) is cls), type(model).__name__)
+    return {
+        "backend": backend,
+        "label": BACKEND_LABELS.get(backend, backend),
+        "n_estimators": getattr(model, "n_estimators", getattr(model, "max_iter", None)),
+        "max_depth": getattr(model, "max_depth", None),
+    }
@@ -0,0 +1,123 @@
+import argparse
+import multiprocessing
+import os
+import time
+import numpy as np
+from concurrent.futures import ProcessPoolExecutor
+from stock.backends import MODEL_BACKEND, BACKENDS
+from stock.forecast_engine import forecast_recursive
+from stock.training import SYMBOLS, load_features, fit_model, log
+
+# === Config ===
+BACKTEST_HORIZON = 15
+BACKTEST_ORIGINS = 200
+BACKTEST_FOLDS = 5
+BACKTEST_MIN_TRAIN = 0.5  # fraction of history before the first origin
+
+
+def backtest_frame(df, horizon: int = BACKTEST_HORIZON, n_origins: int = BACKTEST_ORIGINS,
+                   n_folds: int = BACKTEST_FOLDS, min_train: float = BACKTEST_MIN_TRAIN,
+                   backend: str = MODEL_BACKEND):
+    """Walk-forward backtest of the recursive SMA/EMA forecast over one feature frame.
+
+    Origins are spread evenly over the history after ``min_train``. The model is
+    refit on an expanding window at the start of each of ``n_folds`` folds. All
+    origins in a fold run their ``horizon``-step recursion together, as one
+    batched predict per step. Returns the per-origin predictions and actuals.
+    """
+    closes = df['Close'].to_numpy(dtype=np.float64)
+    sma = df['SMA_50'].to_numpy(dtype=np.float64)
+    ema = df['EMA_20'].to_numpy(dtype=np.float64)
+
+    first = int(len(df) * min_train)
+    last = len(df) - horizon - 1
+    if last <= first:
+        raise ValueError(f"Not enough history for a {horizon}-day backtest ({len(df)} rows)")
+    origins = np.unique(np.linspace(first, last, min(n_origins, last - first + 1)).astype(np.intp))
+
+    preds = np.empty((len(origins), horizon), dtype=np.float64)
+    for fold in np.array_split(np.arange(len(origins)), min(n_folds, len(origins))):
+        fold_origins = origins[fold]
+        # Train only on bars up to and including the fold's first origin.
+        model, scaler = fit_model(df.iloc[:fold_origins[0] + 1], backend)
+        n = len(fold_origins)
+        preds[fold] = forecast_recursive(
+            [model] * n, [scaler] * n, sma[fold_origins], ema[fold_origins], horizon, predict=model.predict)
+
+    actual = closes[origins[:, None] + 1 + np.arange(horizon)]
+    return origins, preds, actual
+
+
+def horizon_errors(preds, actual) -> dict:
+    """MAE, RMSE and MAPE per forecast step (step 1 is the first day ahead)."""
+    err = preds - actual
+    return {
+        "MAE": np.mean(np.abs(err), axis=0).tolist(),
+        "RMSE": np.sqrt(np.mean(err ** 2, axis=0)).tolist(),
+        "MAPE": (np.mean(np.abs(err) / np.abs(actual), axis=0) * 100).tolist(),
+    }
+
+
+def backtest_symbol(symbol: str, horizon: int = BACKTEST_HORIZON, n_origins: int = BACKTEST_ORIGINS,
+                    backend: str = MODEL_BACKEND) -> dict:
+    start = time.perf_counter()
+    try:
+        origins, preds, actual = backtest_frame(load_features(symbol), horizon, n_origins, backend=backend)
+        return {"symbol": symbol, "status": "ok", "origins": len(origins),
+                "errors": horizon_errors(preds, actual), "seconds": time.perf_counter() - start}
+    except Exception as e:
+        return {"symbol": symbol, "status": "error", "error": str(e), "seconds": time.perf_counter() - start}
+
+
+def backtest_universe(symbols, horizon: int = BACKTEST_HORIZON, n_origins: int = BACKTEST_ORIGINS,
+                      backend: str = MODEL_BACKEND, workers=None) -> dict:
+    """Backtest ``symbols`` in a process pool. Returns per-symbol reports and the pooled errors."""
+    symbols = list(symbols)
+    workers = min(workers or os.cpu_count() or 1, max(len(symbols), 1))
+    args = [(sym, horizon, n_origins, backend) for sym in symbols]
+    if workers == 1:
+        reports = [backtest_symbol(*a) for a in args]
+    else:
+        # Spawned, not forked: this also runs from a scheduler thread of the API server.
+        with ProcessPoolExecutor(max_workers=workers, mp_context=multiprocessing.get_context("spawn")) as pool:
+            reports = list(pool.map(backtest_symbol, *zip(*args)))
+
+    ok = [r for r in reports if r["status"] == "ok"]
+    overall = None
+    if ok:
+        weights = np.array([r["origins"] for r in ok], dtype=np.float64)
+        overall = {
+            metric: np.average([r["errors"][metric] for r in ok], axis=0, weights=weights).tolist()
+            for metric in ("MAE", "MAPE")
+        }
+        overall["RMSE"] = np.sqrt(np.average(
+            [np.square(r["errors"]["RMSE"]) for r in ok], axis=0, weights=weights)).tolist()
+    return {"horizon": horizon, "backend": backend, "symbols": reports, "overall": overall}
+
+
+# === CLI ===
+def main(argv=None):
+    parser = argparse.ArgumentParser(description="Walk-forward backtest of the stock forecaster.")
+    parser.add_argument("--symbols", nargs="*", default=SYMBOLS)
+    parser.add_argument("--horizon", type=int, default=BACKTEST_HORIZON)
+    parser.add_argument("--origins", type=int, default=BACKTEST_ORIGINS)
+    parser.add_argument("--backend", choices=list(BACKENDS), default=MODEL_BACKEND)
+    parser.add_argument("--workers", type=int, default=None)
+    args = parser.parse_args(argv)
+
+    start = time.perf_counter()
+    result = backtest_universe(args.symbols, args.horizon, args.origins, args.backend, args.workers)
+    for r in result["symbols"]:
+        if r["status"] == "ok":
+            log(f"{r['symbol']}: MAE@1={r['errors']['MAE'][0]:.3f} MAE@{args.horizon}={r['errors']['MAE'][-1]:.3f} "
+                f"({r['origins']} origins, {r['seconds']:.2f}s)")
+        else:
+            log(f"{r['symbol']}: failed: {r['error']}")
+    if result["overall"]:
+        log("Overall MAE by horizon: " + " ".join(f"{v:.3f}" for v in result["overall"]["MAE"]))
+    log(f"Done in {time.perf_counter() - start:.2f}s")
+    return 0
+
+
+if __name__ == "__main__":
+    raise SystemExit(main())
@@ -0,0 +1,71 @@
+import numpy as np
+import pandas as pd
+from datetime import datetime
+
+# === Recurrence Config ===
+SMA_WINDOW = 50
+EMA_WINDOW = 20
+
+
+def scaler_params(scalers):
+    """Stack fitted MinMaxScaler parameters into (n_symbols, 3) scale/offset arrays."""
+    scale = np.vstack([s.scale_ for s in scalers]).astype(np.float64)
+    offset = np.vstack([s.min_ for s in scalers]).astype(np.float64)
+    return scale, offset
+
+
+def per_model_predict(models):
+    """Default predictor: rows that share a model object are scored in one ``predict`` call.
+
+    Distinct models still need a call each; pass a combined predictor such as
+    ``ForestSet.predictor()`` to score every row at once.
+    """
+    groups = {}
+    for i, m in enumerate(models):
+        groups.setdefault(id(m), (m, []))[1].append(i)
+    groups = [(m, np.array(rows, dtype=np.intp)) for m, rows in groups.values()]
+
+    def predict(X):
+        out = np.empty(len(X), dtype=np.float64)
+        for m, rows in groups:
+            out[rows] = m.predict(X[rows])
+        return out
+    return predict
+
+
+def forecast_recursive(models, scalers, sma, ema, days, predict=None):
+    """Advance the SMA_50/EMA_20 recurrence for every symbol at once.
+
+    Row ``i`` of the inputs belongs to ``models[i]``/``scalers[i]``. Scaling is done
+    arithmetically with the scalers' ``scale_``/``min_`` so each day is one call to
+    ``predict`` over all rows. The default predictor makes one model call per
+    distinct model; a combined ``predict`` makes it a single batched call.
+    Returns a (n_symbols, days) array of predicted closes.
+    """
+    if predict is None:
+        predict = per_model_predict(models)
+
+    sma = np.array(sma, dtype=np.float64).reshape(-1)
+    ema = np.array(ema, dtype=np.float64).reshape(-1)
+    scale, offset = scaler_params(scalers)
+
+    n = len(sma)
+    out = np.empty((n, days), dtype=np.float64)
+    X = np.empty((n, 2), dtype=np.float64)
+    for step in range(days):
+        # MinMaxScaler.transform: x * scale_ + min_
+        X[:, 0] = sma * scale[:, 1] + offset[:, 1]
+        X[:, 1] = ema * scale[:, 2] + offset[:, 2]
+        pred_scaled = predict(X)
+        # MinMaxScaler.inverse_transform: (x - min_) / scale_
+        close = (pred_scaled - offset[:, 0]) / scale[:, 0]
+        out[:, step] = close
+        ema = (ema * (EMA_WINDOW - 1) + close) / EMA_WINDOW
+        sma = (sma * (SMA_WINDOW - 1) + close) / SMA_WINDOW
+    return out
+
+
+def forecast_dates(days, start=None):
+    """Calendar dates for a ``days``-step forecast starting today."""
+    start = start or datetime.today()
+    return [d.strftime('%Y-%m-%d') for d in pd.date_range(start, periods=days, freq='D')]
@@ -0,0 +1,108 @@
+import numpy as np
+
+
+class CompiledForest:
+    """A fitted RandomForestRegressor flattened into contiguous node arrays.
+
+    Node ``i`` sends a row to ``left[i]`` when ``x[feature[i]] <= threshold[i]``,
+    else to ``right[i]``. Leaves point to themselves, so traversal can run a fixed
+    ``depth`` steps without masking. ``roots`` holds each tree's first node.
+    """
+
+    def __init__(self, feature, threshold, left, right, value, roots, depth, n_features):
+        self.feature = feature
+        self.threshold = threshold
+        self.left = left
+        self.right = right
+        self.value = value
+        self.roots = roots
+        self.depth = depth
+        self.n_features = n_features
+
+    @property
+    def n_trees(self) -> int:
+        return len(self.roots)
+
+    @property
+    def nbytes(self) -> int:
+        return sum(a.nbytes for a in (self.feature, self.threshold, self.left, self.right, self.value, self.roots))
+
+    def predict(self, X):
+        return ForestSet([self]).predict(np.zeros(len(X), dtype=np.intp), X)
+
+
+def compile_forest(model) -> CompiledForest:
+    """Export a fitted single-output RandomForestRegressor to a CompiledForest."""
+    trees = [est.tree_ for est in model.estimators_]
+    sizes = np.array([t.node_count for t in trees])
+    offsets = np.concatenate([[0], np.cumsum(sizes)[:-1]]).astype(np.int32)
+
+    feature, threshold, left, right, value = [], [], [], [], []
+    for tree, offset in zip(trees, offsets):
+        nodes = np.arange(tree.node_count, dtype=np.int32) + offset
+        leaf = tree.children_left == -1
+        feature.append(np.where(leaf, 0, tree.feature).astype(np.int32))
+        threshold.append(tree.threshold.astype(np.float64))
+        left.append(np.where(leaf, nodes, tree.children_left + offset).astype(np.int32))
+        right.append(np.where(leaf, nodes, tree.children_right + offset).astype(np.int32))
+        value.append(tree.value[:, 0, 0].astype(np.float64))
+
+    return CompiledForest(
+        feature=np.concatenate(feature),
+        threshold=np.concatenate(threshold),
+        left=np.concatenate(left),
+        right=np.concatenate(right),
+        value=np.concatenate(value),
+        roots=offsets,
+        depth=max(t.max_depth for t in trees),
+        n_features=model.n_features_in_,
+    )
+
+
+class ForestSet:
+    """Several compiled forests packed together so one call can score rows of any of them."""
+
+    def __init__(self, forests):
+        forests = list(forests)
+        sizes = np.array([len(f.value) for f in forests])
+        offsets = np.concatenate([[0], np.cumsum(sizes)]).astype(np.int32)
+        # One shared zero-valued leaf pads forests that have fewer trees.
+        pad = offsets[-1]
+
+        self.feature = np.concatenate([f.feature for f in forests] + [[0]]).astype(np.int32)
+        self.threshold = np.concatenate([f.threshold for f in forests] + [[0.0]])
+        self.left = np.concatenate([f.left + o for f, o in zip(forests, offsets)] + [[pad]]).astype(np.int32)
+        self.right = np.concatenate([f.right + o for f, o in zip(forests, offsets)] + [[pad]]).astype(np.int32)
+        self.value = np.concatenate([f.value for f in forests] + [[0.0]])
+
+        max_trees = max(f.n_trees for f in forests)
+        self.roots = np.full((len(forests), max_trees), pad, dtype=np.int32)
+        for i, (f, o) in enumerate(zip(forests, offsets)):
+            self.roots[i, :f.n_trees] = f.roots + o
+        self.n_trees = np.array([f.n_trees for f in forests], dtype=np.float64)
+        self.depth = max(f.depth for f in forests)
+
+    def predict(self, forest_ids, X):
+        """Score row ``i`` of ``X`` with forest ``forest_ids[i]``; matches sklearn's ``predict``."""
+        forest_ids = np.asarray(forest_ids, dtype=np.intp)
+        # sklearn evaluates splits on float32 inputs against float64 thresholds.
+        X = np.asarray(X, dtype=np.float32).astype(np.float64)
+        rows = np.arange(len(X))[:, None]
+
+        node = self.roots[forest_ids]
+        for _ in range(self.depth):
+            go_left = X[rows, self.feature[node]] <= self.threshold[node]
+            node = np.where(go_left, self.left[node], self.right[node])
+
+        leaf_values = self.value[node]
+        # Accumulate tree by tree, in order, like sklearn does before averaging.
+        out = np.zeros(len(X), dtype=np.float64)
+        for t in range(leaf_values.shape[1]):
+            out += leaf_values[:, t]
+        out /= self.n_trees[forest_ids]
+        return out
+
+    def predictor(self):
+        """Adapter for ``forecast_recursive``: row ``i`` is scored by forest ``i``."""
+        ids = np.arange(len(self.roots), dtype=np.intp)
+        return lambda X: self.predict(ids, X)
@@ -0,0 +1,198 @@
+import os
+import threading
+import numpy as np
+import pandas as pd
+from collections import OrderedDict
+from datetime import datetime, timedelta
+from stock.market_data import get_price_store
+
+# === Config ===
+SMA_WINDOW = 50
+EMA_SPAN = 20
+SEED_DAYS = 182  # same 6-month lookback the router used to recompute from
+INDICATOR_CACHE_SIZE = int(os.environ.get("STOCK_INDICATOR_CACHE_SIZE", "4096"))
+
+
+class IndicatorState:
+    """O(1) streaming SMA_50 / EMA_20 for one symbol.
+
+    The SMA keeps a ring buffer of the last ``sma_window`` closes and a running
+    sum; the EMA matches ``ewm(span=ema_span, adjust=False)``.
+    """
+
+    def __init__(self, sma_window: int = SMA_WINDOW, ema_span: int = EMA_SPAN):
+        self.sma_window = sma_window
+        self.alpha = 2.0 / (ema_span + 1)
+        self._buffer = np.zeros(sma_window, dtype=np.float64)
+        self._pos = 0
+        self._sum = 0.0
+        self.count = 0
+        self.ema = None
+        self._prev_ema = None
+        self.last_date = None
+        self.last_close = None
+
+    @property
+    def ready(self) -> bool:
+        return self.count >= self.sma_window
+
+    @property
+    def sma(self):
+        return self._sum / self.sma_window if self.ready else None
+
+    def update(self, close: float, date=None):
+        """Fold in one bar. Bars dated on or before ``last_date`` are ignored."""
+        if date is not None:
+            date = pd.Timestamp(date).normalize()
+            if self.last_date is not None and date <= self.last_date:
+                return self.sma, self.ema
+            self.last_date = date
+
+        close = float(close)
+        self._sum += close - self._buffer[self._pos]
+        self._buffer[self._pos] = close
+        self._pos = (self._pos + 1) % self.sma_window
+        self.count += 1
+        if self._pos == 0:
+            # Re-sum once per lap so floating-point drift cannot accumulate.
+            self._sum = float(self._buffer.sum())
+
+        self._prev_ema = self.ema
+        self.ema = close if self.ema is None else self.ema + self.alpha * (close - self.ema)
+        self.last_close = close
+        return self.sma, self.ema
+
+    def revise(self, close: float):
+        """Replace the most recent bar's close, e.g. once a partial session has closed."""
+        if self.count == 0:
+            raise ValueError("No bar to revise")
+        close = float(close)
+        last = (self._pos - 1) % self.sma_window
+        self._sum += close - self._buffer[last]
+        self._buffer[last] = close
+        prev = self._prev_ema
+        self.ema = close if prev is None else prev + self.alpha * (close - prev)
+        self.last_close = close
+        return self.sma, self.ema
+
+    def update_many(self, closes, dates=None):
+        """Fold in a batch of bars in order."""
+        if dates is None:
+            dates = [None] * len(closes)
+        for close, date in zip(closes, dates):
+            self.update(close, date)
+        return self.sma, self.ema
+
+    @classmethod
+    def from_history(cls, closes, dates=None, **kwargs):
+        state = cls(**kwargs)
+        state.update_many(closes, dates)
+        return state
+
+
+class IndicatorBook:
+    """Per-symbol indicator states, seeded lazily from the local price store.
+
+    Every read folds in stored bars newer than the state's ``last_date`` (and
+    the revised close of that date, if the store refetched it), so the
+    features follow the price store. Ingested bars are written through to the
+    store first. Only the ``max_states`` most recently used states are kept;
+    an evicted symbol is re-seeded from the store on its next read.
+    """
+
+    def __init__(self, store=None, max_states: int = INDICATOR_CACHE_SIZE):
+        self.store = store
+        self.max_states = max_states
+        self._states = OrderedDict()
+        self._lock = threading.Lock()
+
+    def state(self, symbol: str, refresh: bool = True) -> IndicatorState:
+        store = self.store or get_price_store()
+        with self._lock:
+            state = self._states.get(symbol)
+            if state is not None:
+                self._states.move_to_end(symbol)
+        if state is None:
+            df = store.frame(symbol, start=datetime.today() - timedelta(days=SEED_DAYS), refresh=refresh)
+            state = IndicatorState.from_history(df['Close'].to_numpy(), df['Date'])
+            if state.last_date is None:
+                # Nothing stored yet: seed again on the next read instead of caching an empty state.
+                return state
+            with self._lock:
+                state = self._states.setdefault(symbol, state)
+                while len(self._states) > self.max_states:
+                    self._states.popitem(last=False)
+        dates, closes = store.window(symbol, start=state.last_date, refresh=refresh)
+        with self._lock:
+            for date, close in zip(pd.to_datetime(dates), closes.tolist()):
+                if date == state.last_date:
+                    if close != state.last_close:
+                        state.revise(close)
+                else:
+                    state.update(close, date)
+        return state
+
+    def ingest(self, symbol: str, closes, dates):
+        """Append bars dated after the last known bar and up to today, in increasing order.
+
+        Raises ValueError for out-of-order or future dates. Bars are stored in
+        the price store and then folded into the indicator state.
+        """
+        if len(closes) != len(dates):
+            raise ValueError("closes and dates must have the same length")
+        dates = pd.to_datetime(pd.Series(dates)).dt.normalize()
+        if len(dates) == 0:
+            state = self.state(symbol, refresh=False)
+            return state.sma, state.ema
+        if not dates.is_monotonic_increasing or not dates.is_unique:
+            raise ValueError("Bar dates must be strictly increasing")
+        if dates.iloc[-1] > pd.Timestamp(datetime.today().date()):
+            raise ValueError(f"Bar dated {dates.iloc[-1].date()} is in the future")
+
+        state = self.state(symbol, refresh=False)
+        if state.last_date is not None and dates.iloc[0] <= state.last_date:
+            raise ValueError(f"Bar dated {dates.iloc[0].date()} is not after the last bar "
+                             f"({state.last_date.date()}) for {symbol}")
+        (self.store or get_price_store()).append(symbol, dates, closes)
+        state = self.state(symbol, refresh=False)
+        return state.sma, state.ema
+
+    def features(self, symbol: str):
+        """Current ``(sma_50, ema_20)`` for ``symbol``."""
+        state = self.state(symbol)
+        if not state.ready:
+            raise ValueError(f"Not enough history for {symbol} ({state.count} bars)")
+        return state.sma, state.ema
+
+    def reset(self, symbol: str = None):
+        with self._lock:
+            if symbol is None:
+                self._states.clear()
+            else:
+                self._states.pop(symbol, None)
+
+
+# === Feed Adapters ===
+def replay_file(path: str, book: "IndicatorBook", batch_size: int = 500):
+    """Drive ``book`` from a local CSV of ``Symbol,Date,Close`` bars. Returns bars per symbol."""
+    counts = {}
+    for chunk in pd.read_csv(path, parse_dates=["Date"], chunksize=batch_size):
+        for symbol, bars in chunk.sort_values("Date").groupby("Symbol", sort=False):
+            # Bars the book already has (from an earlier replay or the store) are skipped.
+            last = book.state(symbol, refresh=False).last_date
+            if last is not None:
+                bars = bars[bars["Date"] > last]
+            if len(bars):
+                book.ingest(symbol, bars["Close"].to_numpy(), bars["Date"])
+                counts[symbol] = counts.get(symbol, 0) + len(bars)
+    return counts
+
+
+_book = None
+
+
+def get_indicator_book() -> IndicatorBook:
+    global _book
+    if _book is None:
+        _book = IndicatorBook()
+    return _book
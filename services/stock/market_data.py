@@ -0,0 +1,255 @@
+import logging
+import os
+import threading
+import numpy as np
+import pandas as pd
+from collections import OrderedDict
+from datetime import datetime, timedelta
+from stock.single_flight import SingleFlight
+
+logger = logging.getLogger(__name__)
+
+# === Config ===
+PRICE_DIR = os.environ.get("STOCK_PRICE_DIR", "price_history")
+PRICE_PROVIDER = os.environ.get("STOCK_PRICE_PROVIDER", "yfinance")
+PRICE_CSV_DIR = os.environ.get("STOCK_PRICE_CSV_DIR", "price_csv")
+HISTORY_START = "2014-01-01"
+REFRESH_INTERVAL = 15 * 60  # seconds between tail fetches for one symbol
+FAILURE_BACKOFF = float(os.environ.get("STOCK_PRICE_FAILURE_BACKOFF", "60"))  # seconds before retrying a failure
+SERIES_CACHE_SIZE = int(os.environ.get("STOCK_SERIES_CACHE_SIZE", "256"))  # symbols with in-memory arrays
+REFETCH_BARS = 1  # trailing stored bars re-requested on every update (may be a partial session)
+
+# Lookback per chart period; every period is served from one cached series.
+PERIOD_DAYS = {
+    "1d": 2,  # go back 2 days to catch the last available day
+    "7d": 7,
+    "1mo": 30,
+    "3mo": 90,
+    "6mo": 180,
+    "1y": 365,
+    "3y": 3 * 365,
+    "5y": 5 * 365,
+}
+
+COLUMNS = ["Open", "High", "Low", "Close"]
+BAR_DTYPE = np.dtype([("Date", "datetime64[D]")] + [(c, "f8") for c in COLUMNS])
+
+
+# === Providers ===
+class YFinanceProvider:
+    """Fetches daily OHLC bars from Yahoo Finance."""
+
+    def fetch(self, symbol: str, start, end) -> pd.DataFrame:
+        import yfinance as yf
+        df = yf.download(symbol, start=start, end=end, progress=False)
+        if isinstance(df.columns, pd.MultiIndex):
+            df.columns = df.columns.get_level_values(0)
+        return df
+
+
+class CSVProvider:
+    """Serves bars from ``{directory}/{symbol}.csv`` files (Date,Open,High,Low,Close); no network."""
+
+    def __init__(self, directory: str):
+        self.directory = directory
+
+    def fetch(self, symbol: str, start, end) -> pd.DataFrame:
+        df = pd.read_csv(os.path.join(self.directory, f"{symbol}.csv"), parse_dates=["Date"])
+        df = df.set_index("Date").sort_index()
+        return df.loc[pd.Timestamp(start):pd.Timestamp(end) - timedelta(days=1)]
+
+
+def make_provider(name: str = PRICE_PROVIDER):
+    if name == "csv":
+        return CSVProvider(PRICE_CSV_DIR)
+    if name == "yfinance":
+        return YFinanceProvider()
+    raise ValueError(f"Unknown price provider: {name}")
+
+
+# === Store ===
+class PriceStore:
+    """Per-symbol OHLC history kept as memory-mapped ``.npy`` files indexed by date.
+
+    Reads come from disk; only the tail from the last ``refetch_bars`` stored
+    bars onwards is requested from the provider, at most once per
+    ``refresh_interval`` and never twice concurrently for the same symbol. The
+    refetched bars overwrite the stored ones, so a bar saved mid-session is
+    replaced by its final values.
+    """
+
+    def __init__(self, root: str = PRICE_DIR, provider=None, history_start: str = HISTORY_START,
+                 refresh_interval: float = REFRESH_INTERVAL, refetch_bars: int = REFETCH_BARS,
+                 failure_backoff: float = FAILURE_BACKOFF, series_cache_size: int = SERIES_CACHE_SIZE):
+        self.root = root
+        self.provider = provider or make_provider()
+        self.history_start = history_start
+        self.refresh_interval = refresh_interval
+        self.refetch_bars = refetch_bars
+        # Concurrent refreshes of one symbol share a single upstream fetch, and a
+        # finished refresh is reused for ``refresh_interval`` seconds. A failed
+        # one is not retried for ``failure_backoff`` seconds.
+        self._refresh = SingleFlight(ttl=refresh_interval, error_ttl=failure_backoff)
+        # Serializes read-merge-write of the ``.npy`` files (tail fetches and appends).
+        self._write_lock = threading.Lock()
+        # LRU of ``series()`` arrays, so memory stays bounded however many symbols are served.
+        self._series = OrderedDict()
+        self._series_lock = threading.Lock()
+        self.series_cache_size = series_cache_size
+        os.makedirs(root, exist_ok=True)
+
+    def path(self, symbol: str) -> str:
+        return os.path.join(self.root, f"{symbol}.npy")
+
+    def load(self, symbol: str) -> np.ndarray:
+        """Stored bars for ``symbol`` (read-only memory map); empty if none."""
+        path = self.path(symbol)
+        if not os.path.exists(path):
+            return np.empty(0, dtype=BAR_DTYPE)
+        return np.load(path, mmap_mode="r")
+
+    def update(self, symbol: str, force: bool = False) -> int:
+        """Refetch the stored tail and append newer bars. Returns the number of new dates.
+
+        Provider errors are logged and the stored bars are served as they are;
+        they are raised only when nothing is stored for ``symbol`` yet.
+        """
+        try:
+            return self._refresh.do(symbol, lambda: self._update(symbol), refresh=force)
+        except Exception as e:
+            if len(self.load(symbol)) == 0:
+                raise
+            logger.warning(f"Price refresh for {symbol} failed, serving stored bars: {e}")
+            return 0
+
+    def fetch_stats(self):
+        """Upstream fetches made versus requests served by coalescing or the TTL."""
+        return self._refresh.stats()
+
+    def _update(self, symbol: str) -> int:
+        bars = self.load(symbol)
+        today = np.datetime64(datetime.today().date(), "D")
+        keep = max(len(bars) - self.refetch_bars, 0)
+        start = bars["Date"][keep] if keep < len(bars) else np.datetime64(self.history_start, "D")
+        if start > today:
+            return 0
+
+        df = self.provider.fetch(symbol, str(start), str(today + 1))
+        new = self._to_bars(df)
+        new = new[new["Date"] >= start]
+        if len(new) == 0:
+            return 0
+
+        with self._write_lock:
+            # Re-read: an append may have landed while the provider was fetching.
+            bars = self.load(symbol)
+            keep = int(np.searchsorted(bars["Date"], start, "left"))
+            tail = np.asarray(bars[keep:])
+            if np.array_equal(tail, new):
+                return 0
+            # Refetched dates replace the stored bars; stored bars the provider did not return are kept.
+            tail = tail[~np.isin(tail["Date"], new["Date"])]
+            merged = np.sort(np.concatenate([np.asarray(bars[:keep]), tail, new]), order="Date")
+            self._write(symbol, merged)
+        return int(np.count_nonzero(new["Date"] > bars["Date"][-1])) if len(bars) else len(new)
+
+    def append(self, symbol: str, dates, closes) -> int:
+        """Store externally ingested closes after the last stored bar. Returns the number written.
+
+        Only the close is known, so Open/High/Low are NaN until the provider's
+        bar for that date replaces it on a later ``update``.
+        """
+        new = np.empty(len(closes), dtype=BAR_DTYPE)
+        new["Date"] = pd.to_datetime(pd.Series(dates)).values.astype("datetime64[D]")
+        for c in COLUMNS:
+            new[c] = np.nan
+        new["Close"] = np.asarray(closes, dtype=np.float64)
+        with self._write_lock:
+            bars = self.load(symbol)
+            if len(bars):
+                new = new[new["Date"] > bars["Date"][-1]]
+            if len(new) == 0:
+                return 0
+            self._write(symbol, np.concatenate([np.asarray(bars), new]) if len(bars) else new)
+        return len(new)
+
+    def frame(self, symbol: str, start=None, end=None, refresh: bool = True) -> pd.DataFrame:
+        """Bars between ``start`` and ``end`` (inclusive) as a DataFrame with a ``Date`` column."""
+        if refresh:
+            self.update(symbol)
+        bars = self.load(symbol)
+        dates = bars["Date"]
+        lo = 0 if start is None else np.searchsorted(dates, _day(start), "left")
+        hi = len(bars) if end is None else np.searchsorted(dates, _day(end), "right")
+        window = bars[lo:hi]
+        df = pd.DataFrame({c: np.asarray(window[c]) for c in COLUMNS})
+        df.insert(0, "Date", pd.to_datetime(np.asarray(window["Date"])))
+        return df
+
+    def series(self, symbol: str, refresh: bool = True):
+        """Cached ``(dates, closes)`` arrays of the full stored history for ``symbol``.
+
+        The arrays are rebuilt only when the backing file changes on disk, and
+        only the ``series_cache_size`` most recently used symbols are kept.
+        """
+        if refresh:
+            self.update(symbol)
+        path = self.path(symbol)
+        version = os.stat(path).st_mtime_ns if os.path.exists(path) else None
+        with self._series_lock:
+            cached = self._series.get(symbol)
+            if cached is not None and cached[0] == version:
+                self._series.move_to_end(symbol)
+                return cached[1], cached[2]
+        bars = self.load(symbol)
+        dates = np.ascontiguousarray(bars["Date"])
+        closes = np.ascontiguousarray(bars["Close"])
+        with self._series_lock:
+            self._series[symbol] = (version, dates, closes)
+            self._series.move_to_end(symbol)
+            while len(self._series) > self.series_cache_size:
+                self._series.popitem(last=False)
+        return dates, closes
+
+    def window(self, symbol: str, start=None, end=None, refresh: bool = True):
+        """Zero-copy ``(dates, closes)`` views between ``start`` and ``end`` (inclusive)."""
+        dates, closes = self.series(symbol, refresh)
+        lo = 0 if start is None else np.searchsorted(dates, _day(start), "left")
+        hi = len(dates) if end is None else np.searchsorted(dates, _day(end), "right")
+        return dates[lo:hi], closes[lo:hi]
+
+    def period(self, symbol: str, period: str, refresh: bool = True):
+        """``window`` for a chart period such as ``"1y"`` ending today."""
+        end = datetime.today()
+        return self.window(symbol, end - timedelta(days=PERIOD_DAYS[period]), end, refresh)
+
+    def _to_bars(self, df: pd.DataFrame) -> np.ndarray:
+        if df is None or df.empty:
+            return np.empty(0, dtype=BAR_DTYPE)
+        df = df.reset_index()
+        out = np.empty(len(df), dtype=BAR_DTYPE)
+        out["Date"] = pd.to_datetime(df["Date"]).values.astype("datetime64[D]")
+        for c in COLUMNS:
+            out[c] = pd.to_numeric(df[c], errors="coerce").values if c in df else np.nan
+        return np.sort(out, order="Date")
+
+    def _write(self, symbol: str, bars: np.ndarray):
+        path = self.path(symbol)
+        tmp = f"{path}.tmp.npy"
+        np.save(tmp, bars)
+        os.replace(tmp, path)
+
+
+def _day(value) -> np.datetime64:
+    return np.datetime64(pd.Timestamp(value).date(), "D")
+
+
+_store = None
+
+
+def get_price_store() -> PriceStore:
+    """Process-wide store configured from the ``STOCK_PRICE_*`` environment variables."""
+    global _store
+    if _store is None:
+        _store = PriceStore()
+    return _store
@@ -0,0 +1,118 @@
+import os
+import pickle
+import threading
+from sklearn.ensemble import RandomForestRegressor
+from collections import OrderedDict
+from stock.artifact_store import get_artifact_store
+from stock.forest_kernel import compile_forest
+from stock.backends import describe_model
+
+# === Config ===
+REGISTRY_MAX_ENTRIES = int(os.environ.get("STOCK_REGISTRY_MAX_ENTRIES", "32"))
+REGISTRY_MAX_BYTES = int(os.environ.get("STOCK_REGISTRY_MAX_BYTES", str(512 * 1024 * 1024)))
+
+
+class ModelNotTrainedError(FileNotFoundError):
+    """No complete checkpoint is stored for the symbol."""
+
+
+class ModelRegistry:
+    """Process-wide LRU cache of loaded checkpoints per symbol.
+
+    Entries are reloaded when the artifact store reports a new version and evicted
+    least-recently-used first once the entry or byte budget is exceeded. A random
+    forest is kept only in compiled form: the sklearn object is dropped once it is
+    compiled, so an entry costs the forest arrays plus the scaler. Other backends
+    keep their model and are charged the stored checkpoint size.
+    """
+
+    def __init__(self, store=None, max_entries: int = REGISTRY_MAX_ENTRIES,
+                 max_bytes: int = REGISTRY_MAX_BYTES):
+        self.store = store or get_artifact_store()
+        self.max_entries = max_entries
+        self.max_bytes = max_bytes
+        self._entries = OrderedDict()
+        self._bytes = 0
+        self._lock = threading.Lock()
+        self.hits = 0
+        self.misses = 0
+        self.reloads = 0
+        self.evictions = 0
+
+    def get(self, symbol: str) -> dict:
+        """Entry for ``symbol``; raises ModelNotTrainedError if untrained.
+
+        ``scaler`` is the fitted MinMaxScaler and ``info`` the ``describe_model``
+        summary. For a RandomForestRegressor ``forest`` is its compiled form and
+        ``model`` is None; for other backends ``model`` is the regressor and
+        ``forest`` is None.
+        """
+        info = self.store.info(symbol)
+        if info is None:
+            raise ModelNotTrainedError(f"No trained model for {symbol}")
+        version = info["version"]
+
+        with self._lock:
+            entry = self._entries.get(symbol)
+            if entry is not None and entry["version"] == version:
+                self._entries.move_to_end(symbol)
+                self.hits += 1
+                return entry
+            self.misses += 1
+            if entry is not None:
+                self.reloads += 1
+
+        model, scaler = self.store.load(symbol)
+        entry = {"version": version, "model": model, "scaler": scaler, "forest": None,
+                 "info": describe_model(model), "bytes": info["bytes"]}
+        if isinstance(model, RandomForestRegressor):
+            entry["forest"] = compile_forest(model)
+            entry["model"] = None
+            entry["bytes"] = entry["forest"].nbytes + len(pickle.dumps(scaler))
+
+        with self._lock:
+            self._drop(symbol)
+            self._entries[symbol] = entry
+            self._bytes += entry["bytes"]
+            self._evict()
+        return entry
+
+    def invalidate(self, symbol: str = None):
+        """Forget one symbol, or every entry when ``symbol`` is None."""
+        with self._lock:
+            for sym in ([symbol] if symbol else list(self._entries)):
+                self._drop(sym)
+
+    def stats(self):
+        with self._lock:
+            return {
+                "entries": len(self._entries),
+                "bytes": self._bytes,
+                "max_entries": self.max_entries,
+                "max_bytes": self.max_bytes,
+                "hits": self.hits,
+                "misses": self.misses,
+                "reloads": self.reloads,
+                "evictions": self.evictions,
+            }
+
+    def _evict(self):
+        while len(self._entries) > 1 and (
+                len(self._entries) > self.max_entries or self._bytes > self.max_bytes):
+            self._drop(next(iter(self._entries)))
+            self.evictions += 1
+
+    def _drop(self, symbol: str):
+        entry = self._entries.pop(symbol, None)
+        if entry is not None:
+            self._bytes -= entry["bytes"]
+
+
+_registry = None
+
+
+def get_model_registry() -> ModelRegistry:
+    global _registry
+    if _registry is None:
+        _registry = ModelRegistry()
+    return _registry
@@ -0,0 +1,159 @@
+import os
+import threading
+import time
+import uuid
+from collections import deque
+from concurrent.futures import ThreadPoolExecutor
+from datetime import datetime
+from stock.artifact_store import get_artifact_store
+from stock.training import SYMBOLS, train_and_save_model, log
+from stock.backends import MODEL_BACKEND
+from stock.backtest import backtest_universe
+
+# === Config ===
+RETRAIN_INTERVAL = float(os.environ.get("STOCK_RETRAIN_INTERVAL", str(24 * 3600)))  # 0 disables the loop
+RETRAIN_CHECK_INTERVAL = float(os.environ.get("STOCK_RETRAIN_CHECK_INTERVAL", "600"))
+RETRAIN_WORKERS = int(os.environ.get("STOCK_RETRAIN_WORKERS", "2"))
+JOB_HISTORY = int(os.environ.get("STOCK_JOB_HISTORY", "1000"))  # finished jobs kept for status lookups
+BACKTEST_CACHE_TTL = 6 * 3600
+
+
+class RetrainScheduler:
+    """Runs stock retraining and backtest jobs off the request path.
+
+    Jobs run on a small worker pool; retrained artifacts are swapped in
+    atomically by ``train_and_save_model``. When started, a background loop
+    also queues every symbol whose checkpoint is older than ``interval``.
+    Identical pending jobs are shared; only the last ``history`` finished
+    jobs are kept for status lookups.
+    """
+
+    def __init__(self, symbols=SYMBOLS, store=None, interval: float = RETRAIN_INTERVAL,
+                 check_interval: float = RETRAIN_CHECK_INTERVAL, workers: int = RETRAIN_WORKERS,
+                 history: int = JOB_HISTORY):
+        self.symbols = list(symbols)
+        self.store = store or get_artifact_store()
+        self.interval = interval
+        self.check_interval = check_interval
+        self._pool = ThreadPoolExecutor(max_workers=workers, thread_name_prefix="stock-retrain")
+        self._jobs = {}
+        self._active = {}
+        self._done = {}
+        self._finished = deque()
+        self.history = history
+        self._lock = threading.Lock()
+        self._stop = threading.Event()
+        self._thread = None
+
+    # === Jobs ===
+    def submit(self, symbol: str) -> dict:
+        """Queue a retrain of ``symbol``; returns the already-pending job if there is one."""
+        return self._submit(("train", symbol), lambda: train_and_save_model(symbol, self.store),
+                            {"kind": "train", "symbol": symbol})
+
+    def submit_backtest(self, symbols, horizon: int, origins: int, backend: str = MODEL_BACKEND) -> dict:
+        """Queue a walk-forward backtest; the report is the finished job's ``result``.
+
+        Identical requests share the pending job, and a finished one is reused
+        for ``BACKTEST_CACHE_TTL`` seconds.
+        """
+        symbols = list(symbols)
+        return self._submit(("backtest", tuple(symbols), horizon, origins, backend),
+                            lambda: backtest_universe(symbols, horizon, origins, backend),
+                            {"kind": "backtest", "symbols": symbols, "horizon": horizon,
+                             "origins": origins, "backend": backend},
+                            reuse_for=BACKTEST_CACHE_TTL)
+
+    def status(self, job_id: str):
+        with self._lock:
+            job = self._jobs.get(job_id)
+            return dict(job) if job else None
+
+    def _submit(self, key, fn, fields: dict, reuse_for: float = 0.0) -> dict:
+        with self._lock:
+            job_id = self._active.get(key)
+            if job_id is None and reuse_for > 0:
+                done = self._done.get(key)
+                if done is not None and time.monotonic() - done[0] < reuse_for and done[1] in self._jobs:
+                    job_id = done[1]
+            if job_id is not None:
+                return dict(self._jobs[job_id])
+            job_id = uuid.uuid4().hex
+            self._jobs[job_id] = {
+                "job_id": job_id,
+                **fields,
+                "status": "queued",
+                "submitted": datetime.now().isoformat(timespec="seconds"),
+                "started": None,
+                "finished": None,
+                "seconds": None,
+                "error": None,
+                "result": None,
+            }
+            self._active[key] = job_id
+            job = dict(self._jobs[job_id])
+        self._pool.submit(self._run, job_id, key, fn)
+        return job
+
+    def _run(self, job_id: str, key, fn):
+        with self._lock:
+            job = self._jobs[job_id]
+            job["status"] = "running"
+            job["started"] = datetime.now().isoformat(timespec="seconds")
+        start = time.perf_counter()
+        result = None
+        try:
+            result = fn()
+            status, error = "done", None
+        except Exception as e:
+            status, error = "failed", str(e)
+        with self._lock:
+            job.update(status=status, error=error, result=result, seconds=time.perf_counter() - start,
+                       finished=datetime.now().isoformat(timespec="seconds"))
+            self._active.pop(key, None)
+            if status == "done":
+                self._done[key] = (time.monotonic(), job_id)
+            self._finished.append(job_id)
+            while len(self._finished) > self.history:
+                expired = self._jobs.pop(self._finished.popleft(), None)
+                if expired is not None:
+                    self._done = {k: v for k, v in self._done.items() if v[1] != expired["job_id"]}
+        label = job.get("symbol") or f"{len(job['symbols'])} symbol(s)"
+        log(f"{job['kind'].capitalize()} {label} {status} in {job['seconds']:.2f}s" + (f": {error}" if error else ""))
+
+    # === Staleness Loop ===
+    def stale_symbols(self):
+        """Symbols whose model checkpoint is missing or older than ``interval``."""
+        now = time.time()
+        stale = []
+        for sym in self.symbols:
+            info = self.store.info(sym)
+            if info is None or now - info["trained_at"] > self.interval:
+                stale.append(sym)
+        return stale
+
+    def start(self):
+        if self.interval <= 0 or (self._thread is not None and self._thread.is_alive()):
+            return
+        self._stop.clear()
+        self._thread = threading.Thread(target=self._loop, name="stock-retrain-scheduler", daemon=True)
+        self._thread.start()
+
+    def stop(self):
+        self._stop.set()
+
+    def _loop(self):
+        while not self._stop.is_set():
+            for sym in self.stale_symbols():
+                self.submit(sym)
+            self._stop.wait(self.check_interval)
+
+
+_scheduler = None
+
+
+def get_scheduler() -> RetrainScheduler:
+    global _scheduler
+    if _scheduler is None:
+        _scheduler = RetrainScheduler()
+    return _scheduler
@@ -0,0 +1,96 @@
+import threading
+import time
+
+
+class _Call:
+    def __init__(self):
+        self.event = threading.Event()
+        self.value = None
+        self.error = None
+
+
+class SingleFlight:
+    """Coalesces concurrent calls that share a key into one execution.
+
+    Callers that arrive while a call for the same key is in flight wait for it
+    and share its result (or exception). Successful results are kept for ``ttl``
+    seconds so callers arriving shortly after are served without a new call.
+    Failures are kept for ``error_ttl`` seconds and re-raised to later callers,
+    so a failing upstream is retried at most once per ``error_ttl``.
+    """
+
+    def __init__(self, ttl: float = 0.0, max_cached: int = 4096, error_ttl: float = 0.0):
+        self.ttl = ttl
+        self.error_ttl = error_ttl
+        self.max_cached = max_cached
+        self._lock = threading.Lock()
+        self._calls = {}
+        self._results = {}
+        self.calls = 0
+        self.coalesced = 0
+        self.cache_hits = 0
+        self.error_hits = 0
+
+    def do(self, key, fn, refresh: bool = False):
+        """Return ``fn()`` for ``key``, sharing an in-flight or recent result when possible."""
+        with self._lock:
+            if not refresh:
+                cached = self._results.get(key)
+                if cached is not None and cached[0] > time.monotonic():
+                    if cached[2] is not None:
+                        self.error_hits += 1
+                        raise cached[2]
+                    self.cache_hits += 1
+                    return cached[1]
+            call = self._calls.get(key)
+            leader = call is None
+            if leader:
+                call = self._calls[key] = _Call()
+                self.calls += 1
+            else:
+                self.coalesced += 1
+
+        if not leader:
+            call.event.wait()
+            if call.error is not None:
+                raise call.error
+            return call.value
+
+        try:
+            call.value = fn()
+        except BaseException as e:
+            call.error = e
+            raise
+        finally:
+            with self._lock:
+                self._calls.pop(key, None)
+                if call.error is None and self.ttl > 0:
+                    self._remember(key, call.value, None, self.ttl)
+                elif call.error is not None and self.error_ttl > 0 and isinstance(call.error, Exception):
+                    self._remember(key, None, call.error, self.error_ttl)
+            call.event.set()
+        return call.value
+
+    def forget(self, key=None):
+        with self._lock:
+            if key is None:
+                self._results.clear()
+            else:
+                self._results.pop(key, None)
+
+    def stats(self):
+        with self._lock:
+            return {
+                "upstream_calls": self.calls,
+                "coalesced": self.coalesced,
+                "cache_hits": self.cache_hits,
+                "error_hits": self.error_hits,
+                "saved": self.coalesced + self.cache_hits + self.error_hits,
+                "in_flight": len(self._calls),
+            }
+
+    def _remember(self, key, value, error, ttl):
+        now = time.monotonic()
+        if len(self._results) >= self.max_cached:
+            self._results = {k: v for k, v in self._results.items() if v[0] > now}
+        self._results[key] = (now + ttl, value, error)
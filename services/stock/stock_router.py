@@ -1,12 +1,19 @@
-from fastapi import FastAPI, APIRouter, Query, HTTPException
+from fastapi import FastAPI, APIRouter, Query, HTTPException, Request
 from fastapi.middleware.cors import CORSMiddleware
-import pandas as pd
-import yfinance as yf
-import joblib
+from pydantic import BaseModel
 import os
-from datetime import datetime, timedelta
-from sklearn.ensemble import RandomForestRegressor
-from sklearn.preprocessing import MinMaxScaler
+import numpy as np
+from stock.forecast_engine import forecast_recursive, forecast_dates
+from stock.market_data import get_price_store, PERIOD_DAYS
+from stock.training import SYMBOLS
+from stock.artifact_store import get_artifact_store
+from stock.scheduler import get_scheduler
+from stock.model_registry import get_model_registry, ModelNotTrainedError
+from stock.indicators import get_indicator_book
+from stock.forest_kernel import ForestSet
+from stock.backtest import BACKTEST_HORIZON, BACKTEST_ORIGINS
+from common.encoding import negotiate, columnar_response
+from common.downsample import lttb
 
 # === Setup FastAPI app ===
 app = FastAPI()
@@ -21,128 +28,264 @@ app.add_middleware(
 )
 
 # === Config ===
-SYMBOLS = [
-    "AAPL", "META", "AMZN", "NFLX", "GOOGL",
-    "MSFT", "TSLA", "NVDA", "BRK-B", "JPM",
-    "V", "JNJ", "WMT", "UNH", "PG"
-]
-OUTPUT_DIR = "checkpoints"
-os.makedirs(OUTPUT_DIR, exist_ok=True)
+BATCH_MAX_SYMBOLS = int(os.environ.get("STOCK_BATCH_MAX_SYMBOLS", "100"))
+# Symbols whose models are held at once while a batch is forecast.
+BATCH_CHUNK = int(os.environ.get("STOCK_BATCH_CHUNK", "16"))
 
-# === Training Function ===
-def train_and_save_model(symbol: str):
-    yf_symbol = symbol.replace("-", ".")
-    df = yf.download(yf_symbol, start='2014-01-01', end=datetime.today().strftime('%Y-%m-%d'))
 
-    df = df[['Close']].copy().reset_index()
-    df.columns = ['Date', 'Close']
-    df['SMA_50'] = df['Close'].rolling(window=50).mean()
-    df['EMA_20'] = df['Close'].ewm(span=20, adjust=False).mean()
-    df = df.dropna()
+# === Request Schemas ===
+class Bar(BaseModel):
+    date: str
+    close: float
 
-    scaler = MinMaxScaler()
-    df_scaled = scaler.fit_transform(df[['Close', 'SMA_50', 'EMA_20']])
-    X = df_scaled[:, 1:3]
-    y = df_scaled[:, 0]
+class IngestRequest(BaseModel):
+    symbol: str
+    bars: list[Bar]
 
-    model = RandomForestRegressor(n_estimators=100, random_state=42)
-    model.fit(X, y)
 
-    joblib.dump(model, os.path.join(OUTPUT_DIR, f"{symbol}_rf_model.pkl"))
-    joblib.dump(scaler, os.path.join(OUTPUT_DIR, f"{symbol}_scaler.pkl"))
+# === Forecast Helpers ===
+def forecast_symbols(symbols, days: int, errors=None, chunk: int = BATCH_CHUNK):
+    """Forecast ``days`` closes for several symbols, ``chunk`` symbols per vectorized recursion.
+
+    Only one chunk's models are referenced at a time, so the request holds at
+    most ``chunk`` models beyond what the registry keeps. With an ``errors``
+    dict, symbols that cannot be loaded are recorded there and skipped instead
+    of raising. Returns ``(symbols, closes)`` for those forecast.
+    """
+    symbols = list(symbols)
+    ok, closes = [], []
+    for i in range(0, len(symbols), chunk):
+        chunk_ok, chunk_closes = _forecast_chunk(symbols[i:i + chunk], days, errors)
+        ok.extend(chunk_ok)
+        closes.append(chunk_closes)
+    return ok, np.concatenate(closes) if closes else np.empty((0, days))
+
+
+def _forecast_chunk(symbols, days: int, errors=None):
+    registry = get_model_registry()
+    ok, models, scalers, forests, sma, ema = [], [], [], [], [], []
+    for symbol in symbols:
+        try:
+            entry = registry.get(symbol)
+            s, e = get_indicator_book().features(symbol)
+        except ModelNotTrainedError:
+            if errors is None:
+                raise
+            errors[symbol] = "Model not trained yet."
+            continue
+        except Exception as ex:
+            if errors is None:
+                raise
+            errors[symbol] = str(ex)
+            continue
+        ok.append(symbol)
+        models.append(entry["model"])
+        scalers.append(entry["scaler"])
+        forests.append(entry["forest"])
+        sma.append(s)
+        ema.append(e)
+
+    if not ok:
+        return ok, np.empty((0, days))
+    return ok, forecast_recursive(models, scalers, sma, ema, days, predict=make_predictor(models, forests))
+
+
+def _requested_symbols(symbols: str = None):
+    """Deduplicated symbols from a comma-separated query value, capped at ``BATCH_MAX_SYMBOLS``.
+
+    ``None`` means the configured universe, if it fits under the cap.
+    """
+    if symbols is None:
+        if len(SYMBOLS) > BATCH_MAX_SYMBOLS:
+            raise HTTPException(status_code=400, detail=f"The universe has {len(SYMBOLS)} symbols; "
+                                                        f"pass at most {BATCH_MAX_SYMBOLS} explicitly.")
+        return list(SYMBOLS)
+    requested = list(dict.fromkeys(s.strip() for s in symbols.split(",") if s.strip()))
+    if len(requested) > BATCH_MAX_SYMBOLS:
+        raise HTTPException(status_code=400, detail=f"At most {BATCH_MAX_SYMBOLS} symbols per request "
+                                                    f"({len(requested)} requested).")
+    return requested
+
+
+def make_predictor(models, forests):
+    """Score forest rows with one ForestSet call and any other backend with its own predict."""
+    compiled = [i for i, f in enumerate(forests) if f is not None]
+    if len(compiled) == len(models):
+        return ForestSet(forests).predictor()
+    others = [i for i, f in enumerate(forests) if f is None]
+    forest_set = ForestSet([forests[i] for i in compiled]) if compiled else None
+    forest_ids = np.arange(len(compiled), dtype=np.intp)
+
+    def predict(X):
+        out = np.empty(len(X), dtype=np.float64)
+        if forest_set is not None:
+            out[compiled] = forest_set.predict(forest_ids, X[compiled])
+        for i in others:
+            out[i] = models[i].predict(X[i:i + 1])[0]
+        return out
+    return predict
 
 
 # === Routes ===
+@router.on_event("startup")
+def start_retrain_scheduler():
+    get_scheduler().start()
+
+
+@router.on_event("shutdown")
+def stop_retrain_scheduler():
+    get_scheduler().stop()
+
+
 @router.get("/train")
 def train_model(symbol: str = Query(...)):
     try:
-        train_and_save_model(symbol)
-        return {"message": f"{symbol} model trained and saved."}
+        return get_scheduler().submit(symbol)
     except Exception as e:
         raise HTTPException(status_code=500, detail=str(e))
 
 
-@router.get("/predict")
-def predict(symbol: str = Query("AAPL"), days: int = Query(15, ge=1, le=60)):
-    try:
-        model_path = os.path.join(OUTPUT_DIR, f"{symbol}_rf_model.pkl")
-        scaler_path = os.path.join(OUTPUT_DIR, f"{symbol}_scaler.pkl")
-
-        if not os.path.exists(model_path) or not os.path.exists(scaler_path):
-            raise HTTPException(status_code=404, detail="Model not trained yet.")
-
-        model = joblib.load(model_path)
-        scaler = joblib.load(scaler_path)
+@router.get("/train/{job_id}")
+def train_status(job_id: str):
+    job = get_scheduler().status(job_id)
+    if job is None:
+        raise HTTPException(status_code=404, detail=f"Unknown training job: {job_id}")
+    return job
 
-        df = yf.download(symbol, period="6mo")
-        df = df[['Close']].copy().reset_index()
-        df['SMA_50'] = df['Close'].rolling(window=50).mean()
-        df['EMA_20'] = df['Close'].ewm(span=20, adjust=False).mean()
-        df.dropna(inplace=True)
 
-        sma = df['SMA_50'].iloc[-1]
-        ema = df['EMA_20'].iloc[-1]
+@router.post("/ingest")
+def ingest(request: IngestRequest):
+    try:
+        sma, ema = get_indicator_book().ingest(
+            request.symbol, [b.close for b in request.bars], [b.date for b in request.bars])
+        return {"symbol": request.symbol, "SMA_50": sma, "EMA_20": ema}
+    except ValueError as e:
+        raise HTTPException(status_code=400, detail=f"Ingest error: {str(e)}")
+    except Exception as e:
+        raise HTTPException(status_code=500, detail=f"Ingest error: {str(e)}")
 
-        predictions = []
-        future_dates = pd.date_range(datetime.today(), periods=days)
 
-        for date in future_dates:
-            scaled_input = scaler.transform([[0, sma, ema]])[:, 1:3]
-            pred_scaled = model.predict(scaled_input)[0]
-            pred_close = scaler.inverse_transform([[pred_scaled, sma, ema]])[0][0]
-            predictions.append((date.strftime('%Y-%m-%d'), pred_close))
-            sma = (sma * 49 + pred_close) / 50
-            ema = (ema * 19 + pred_close) / 20
+@router.get("/predict")
+def predict(symbol: str = Query("AAPL"), days: int = Query(15, ge=1, le=60)):
+    try:
+        if get_artifact_store().info(symbol) is None:
+            raise HTTPException(status_code=404, detail="Model not trained yet.")
 
+        closes = forecast_symbols([symbol], days)[1][0]
         return {
             "symbol": symbol,
             "days": days,
-            "dates": [d[0] for d in predictions],
-            "predicted": [round(d[1], 2) for d in predictions]
+            "dates": forecast_dates(days),
+            "predicted": [round(float(c), 2) for c in closes]
         }
 
+    except HTTPException:
+        raise
     except Exception as e:
         raise HTTPException(status_code=500, detail=f"Prediction error: {str(e)}")
 
 
-@router.get("/historical")
-def historical(symbol: str = Query("AAPL"), period: str = Query("1y")):
+@router.get("/predict/batch")
+def predict_batch(symbols: str = Query(None, description=f"Comma-separated symbols (at most {BATCH_MAX_SYMBOLS}; "
+                                                         "default: the configured universe if it fits)"),
+                  days: int = Query(15, ge=1, le=60)):
+    requested = _requested_symbols(symbols)
     try:
-        end = datetime.today()
-        start_map = {
-            "1d": end - timedelta(days=2),
-            "7d": end - timedelta(days=7),
-            "1mo": end - timedelta(days=30),
-            "3mo": end - timedelta(days=90),
-            "6mo": end - timedelta(days=180),
-            "1y": end - timedelta(days=365),
-            "3y": end - timedelta(days=3 * 365),
-            "5y": end - timedelta(days=5 * 365)
+        errors = {}
+        ok, closes = forecast_symbols(requested, days, errors=errors)
+        return {
+            "days": days,
+            "dates": forecast_dates(days),
+            "predictions": {
+                symbol: [round(float(c), 2) for c in row] for symbol, row in zip(ok, closes)
+            },
+            "errors": errors,
         }
-        start = start_map.get(period, end - timedelta(days=365))
-        df = yf.download(symbol, start=start, end=end)
-        df = df[['Close']].reset_index()
-        df['Date'] = pd.to_datetime(df['Date']).dt.strftime('%Y-%m-%d')
+    except Exception as e:
+        raise HTTPException(status_code=500, detail=f"Batch prediction error: {str(e)}")
 
-        return {"symbol": symbol, "data": df.to_dict(orient="records")}
+
+@router.get("/historical")
+def historical(request: Request, symbol: str = Query("AAPL"), period: str = Query("1y"),
+               format: str = Query(None, description="'columnar' or 'f32' for compact encodings"),
+               max_points: int = Query(None, ge=3, description="Downsample to at most this many points (LTTB)")):
+    try:
+        dates, closes = get_price_store().period(symbol, period if period in PERIOD_DAYS else "1y")
+        if len(dates) == 0:
+            raise HTTPException(status_code=404, detail=f"No data for {symbol}")
+        if max_points:
+            dates, closes = lttb(dates, closes, max_points)
+
+        media_type = negotiate(request.headers.get("accept"), format)
+        if media_type:
+            return columnar_response(media_type, {"symbol": symbol}, {"dates": dates, "values": closes})
+
+        data = [{"Date": d, "Close": c} for d, c in zip(np.datetime_as_string(dates, unit="D").tolist(), closes.tolist())]
+        return {"symbol": symbol, "data": data}
+    except HTTPException:
+        raise
     except Exception as e:
         raise HTTPException(status_code=500, detail=str(e))
 
 
+@router.get("/backtest")
+def backtest(symbols: str = Query(None, description=f"Comma-separated symbols (at most {BATCH_MAX_SYMBOLS}; "
+                                                    "default: the configured universe if it fits)"),
+             horizon: int = Query(BACKTEST_HORIZON, ge=1, le=60),
+             origins: int = Query(BACKTEST_ORIGINS, ge=1, le=2000)):
+    requested = _requested_symbols(symbols)
+    try:
+        return get_scheduler().submit_backtest(requested, horizon, origins)
+    except Exception as e:
+        raise HTTPException(status_code=500, detail=f"Backtest error: {str(e)}")
+
+
+@router.get("/backtest/{job_id}")
+def backtest_status(job_id: str):
+    job = get_scheduler().status(job_id)
+    if job is None or job["kind"] != "backtest":
+        raise HTTPException(status_code=404, detail=f"Unknown backtest job: {job_id}")
+    return job
+
+
 @router.get("/metrics")
 def metrics(symbol: str = Query("AAPL")):
     try:
-        model = joblib.load(os.path.join(OUTPUT_DIR, f"{symbol}_rf_model.pkl"))
-        scaler = joblib.load(os.path.join(OUTPUT_DIR, f"{symbol}_scaler.pkl"))
+        entry = get_model_registry().get(symbol)
+        info = entry["info"]
         return {
-            "model": f"Random Forest - {symbol}",
-            "n_estimators": model.n_estimators,
-            "max_depth": model.max_depth,
-            "feature_range": scaler.feature_range,
+            "model": f"{info['label']} - {symbol}",
+            **info,
+            "feature_range": entry["scaler"].feature_range,
         }
     except Exception as e:
         raise HTTPException(status_code=500, detail=f"Metrics error: {str(e)}")
 
 
+@router.get("/symbols")
+def symbols(offset: int = Query(0, ge=0), limit: int = Query(100, ge=1, le=1000)):
+    try:
+        store = get_artifact_store()
+        page = SYMBOLS[offset:offset + limit]
+        return {
+            "total": len(SYMBOLS),
+            "offset": offset,
+            "limit": limit,
+            "symbols": [{"symbol": sym, "trained": store.info(sym) is not None} for sym in page],
+        }
+    except Exception as e:
+        raise HTTPException(status_code=500, detail=f"Symbols error: {str(e)}")
+
+
+@router.get("/market-data/stats")
+def market_data_stats():
+    return get_price_store().fetch_stats()
+
+
+@router.get("/registry")
+def registry_stats():
+    return get_model_registry().stats()
+
+
 # ✅ Attach router
 app.include_router(router)
@@ -0,0 +1,129 @@
+import argparse
+import datetime
+import multiprocessing
+import os
+import time
+import pandas as pd
+from concurrent.futures import ProcessPoolExecutor, as_completed
+from sklearn.preprocessing import MinMaxScaler
+from stock.forecast_engine import forecast_recursive, forecast_dates
+from stock.market_data import get_price_store, HISTORY_START
+from stock.backends import MODEL_BACKEND, BACKENDS, make_model
+from stock.artifact_store import ARTIFACT_STORE, ARTIFACT_DIR, ARTIFACT_SHARDS, get_artifact_store, make_artifact_store
+from stock.universe import load_universe
+
+# === Config ===
+SYMBOLS = load_universe()
+PREDICTION_DAYS = 15
+
+
+def log(message):
+    timestamp = datetime.datetime.now().strftime("%Y-%m-%d %H:%M:%S")
+    print(f"[{timestamp}] DEBUG: {message}")
+
+
+# === Training ===
+def load_features(symbol: str) -> pd.DataFrame:
+    """Close history with the SMA_50/EMA_20 features the models are trained on."""
+    df = get_price_store().frame(symbol, start=HISTORY_START)
+
+    df = df[['Date', 'Close']].copy()
+    df['SMA_50'] = df['Close'].rolling(window=50).mean()
+    df['EMA_20'] = df['Close'].ewm(span=20, adjust=False).mean()
+    return df.dropna()
+
+
+def fit_model(df: pd.DataFrame, backend: str = MODEL_BACKEND):
+    """Fit a scaler and a ``backend`` regressor predicting Close from SMA_50/EMA_20."""
+    scaler = MinMaxScaler()
+    df_scaled = scaler.fit_transform(df[['Close', 'SMA_50', 'EMA_20']])
+    X = df_scaled[:, 1:3]
+    y = df_scaled[:, 0]
+
+    model = make_model(backend)
+    model.fit(X, y)
+    return model, scaler
+
+
+def train_and_save_model(symbol: str, store=None, backend: str = MODEL_BACKEND):
+    """Fit one symbol's model and save its model, scaler and future predictions."""
+    store = store or get_artifact_store()
+    df = load_features(symbol)
+    model, scaler = fit_model(df, backend)
+
+    last_row = df.iloc[-1]
+    closes = forecast_recursive([model], [scaler], [last_row['SMA_50']], [last_row['EMA_20']], PREDICTION_DAYS)[0]
+    predictions = pd.DataFrame(list(zip(forecast_dates(PREDICTION_DAYS), closes)), columns=['Date', 'Predicted Close'])
+    store.save(symbol, model, scaler, predictions)
+
+
+def missing_symbols(symbols, store=None):
+    """Symbols that lack a complete set of trained artifacts."""
+    store = store or get_artifact_store()
+    return [sym for sym in symbols if store.info(sym) is None]
+
+
+def _timed_train(symbol: str, store_spec, backend: str):
+    start = time.perf_counter()
+    try:
+        train_and_save_model(symbol, get_artifact_store(store_spec), backend)
+        return {"symbol": symbol, "status": "ok", "seconds": time.perf_counter() - start}
+    except Exception as e:
+        return {"symbol": symbol, "status": "error", "seconds": time.perf_counter() - start, "error": str(e)}
+
+
+def train_universe(symbols, workers=None, store=None, backend: str = MODEL_BACKEND):
+    """Train ``symbols`` in a process pool. Returns one timing report per symbol."""
+    symbols = list(symbols)
+    if not symbols:
+        return []
+    workers = workers or os.cpu_count() or 1
+    # Workers rebuild the store from its spec rather than pickling it.
+    store_spec = (store or get_artifact_store()).spec
+    reports = []
+    if workers == 1:
+        for sym in symbols:
+            reports.append(_timed_train(sym, store_spec, backend))
+            log(_format_report(reports[-1]))
+        return reports
+
+    # Spawned, not forked: Stock_Price_Forecaster calls this from a thread of the API server.
+    context = multiprocessing.get_context("spawn")
+    with ProcessPoolExecutor(max_workers=min(workers, len(symbols)), mp_context=context) as pool:
+        futures = [pool.submit(_timed_train, sym, store_spec, backend) for sym in symbols]
+        for future in as_completed(futures):
+            reports.append(future.result())
+            log(_format_report(reports[-1]))
+    return reports
+
+
+def _format_report(report):
+    if report["status"] == "ok":
+        return f"✅ {report['symbol']} trained in {report['seconds']:.2f}s"
+    return f"❌ {report['symbol']} failed after {report['seconds']:.2f}s: {report['error']}"
+
+
+# === CLI ===
+def main(argv=None):
+    parser = argparse.ArgumentParser(description="Train stock forecasting models.")
+    parser.add_argument("--symbols", nargs="*", default=SYMBOLS, help="Symbols to train (default: all).")
+    parser.add_argument("--workers", type=int, default=None, help="Worker processes (default: CPU count).")
+    parser.add_argument("--store", choices=["files", "sharded"], default=ARTIFACT_STORE)
+    parser.add_argument("--output-dir", default=ARTIFACT_DIR)
+    parser.add_argument("--shards", type=int, default=ARTIFACT_SHARDS)
+    parser.add_argument("--backend", choices=list(BACKENDS), default=MODEL_BACKEND)
+    parser.add_argument("--force", action="store_true", help="Retrain symbols that already have checkpoints.")
+    args = parser.parse_args(argv)
+
+    store = make_artifact_store(args.store, args.output_dir, args.shards)
+    symbols = args.symbols if args.force else missing_symbols(args.symbols, store)
+    log(f"Training {len(symbols)} symbol(s) with {args.workers or os.cpu_count()} worker(s)...")
+    start = time.perf_counter()
+    reports = train_universe(symbols, args.workers, store, args.backend)
+    failed = [r for r in reports if r["status"] != "ok"]
+    log(f"Done in {time.perf_counter() - start:.2f}s ({len(reports) - len(failed)} ok, {len(failed)} failed).")
+    return 1 if failed else 0
+
+
+if __name__ == "__main__":
+    raise SystemExit(main())
@@ -0,0 +1,27 @@
+import os
+
+# === Config ===
+UNIVERSE_FILE = os.environ.get("STOCK_UNIVERSE_FILE")
+
+DEFAULT_SYMBOLS = [
+    "AAPL", "META", "AMZN", "NFLX", "GOOGL",
+    "MSFT", "TSLA", "NVDA", "BRK-B", "JPM",
+    "V", "JNJ", "WMT", "UNH", "PG"
+]
+
+
+def load_universe(path: str = UNIVERSE_FILE):
+    """Symbols to train and serve: one per line (first CSV column) from ``path``, else the defaults.
+
+    Blank lines, ``#`` comments and a ``Symbol`` header are skipped; order is kept and
+    duplicates dropped.
+    """
+    if not path:
+        return list(DEFAULT_SYMBOLS)
+    symbols = []
+    with open(path) as f:
+        for line in f:
+            symbol = line.split("#", 1)[0].split(",", 1)[0].strip().upper()
+            if symbol and symbol != "SYMBOL":
+                symbols.append(symbol)
+    return list(dict.fromkeys(symbols))
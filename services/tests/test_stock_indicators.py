@@ -0,0 +1,29 @@
+"""Run from ``services/``: ``python -m pytest -q tests``."""
+from datetime import datetime, timedelta
+import pandas as pd
+from stock.market_data import PriceStore
+from stock.indicators import IndicatorBook
+
+
+class EmptyProvider:
+    def fetch(self, symbol, start, end):
+        return pd.DataFrame()
+
+
+def test_ingest_seeds_a_symbol_first_seen_with_an_empty_store(tmp_path):
+    store = PriceStore(str(tmp_path), EmptyProvider(), refresh_interval=0)
+    book = IndicatorBook(store)
+    today = datetime.today().date()
+    dates = [str(today - timedelta(days=59 - i)) for i in range(60)]
+    closes = [100.0 + i for i in range(60)]
+
+    # The first read sees an empty store.
+    assert book.state("NEW").count == 0
+
+    sma, ema = book.ingest("NEW", closes, dates)
+
+    expected = pd.Series(closes)
+    assert len(store.load("NEW")) == 60
+    assert sma == expected.rolling(50).mean().iloc[-1]
+    assert abs(ema - expected.ewm(span=20, adjust=False).mean().iloc[-1]) < 1e-9
+    assert book.features("NEW") == (sma, ema)